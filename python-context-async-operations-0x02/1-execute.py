@@ -6,7 +6,7 @@ class ExecuteQuery:
     It automates SQLite database connection management, handles optional parameters, 
     and returns query results, all within a convenient with block.
     """
-    def __init__(self, db_name: str, query: str, params: tuple=None):
+    def __init__(self, db_name: str, query: str, params: tuple=None, stream: bool=False, chunk_size: int=None):
         """
         Initializes the ExecuteQuery context manager.
 
@@ -14,9 +14,13 @@ class ExecuteQuery:
             query (str): The SQL query string to be executed.
             params (tuple, optional): A tuple of parameters to bind to the query. Defaults to None.
             db_name (str): The name of the SQLite database file. Defaults to 'users.db'.
+            stream (bool, optional): Return a lazy iterator over the rows instead of a list. Defaults to False.
+            chunk_size (int, optional): When streaming, yield lists of up to chunk_size rows. Defaults to None.
         """
         self.query = query
         self.params = params if params is not None else ()
+        self.stream = stream
+        self.chunk_size = chunk_size
         self.db_name = db_name
         self.conn = None
         self.cursor = None
@@ -25,12 +29,31 @@ class ExecuteQuery:
         """
         Establishes a database connection, creates a cursor, executes the query,
         fetches all results, and returns them.
+
+        With stream=True the rows are not fetched up front; an iterator that reads
+        them from the cursor on demand is returned instead, and must be consumed
+        inside the 'with' block.
         """
         self.conn = sqlite3.connect(self.db_name)
         self.cursor = self.conn.cursor()
         self.cursor.execute(self.query, self.params)
+        if self.stream:
+            return self._iter_rows()
         return self.cursor.fetchall() # Return all fetched results
 
+    def _iter_rows(self):
+        """
+        Yields rows (or lists of chunk_size rows) from the open cursor.
+        """
+        if self.chunk_size is None:
+            yield from self.cursor
+            return
+        while True:
+            rows = self.cursor.fetchmany(self.chunk_size)
+            if not rows:
+                break
+            yield rows
+
     def __exit__(self, exc_type, exc_val, exc_tb):
         """
         Closes the database cursor and connection upon exiting the 'with' block,
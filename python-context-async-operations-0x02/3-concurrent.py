@@ -1,28 +1,35 @@
 import asyncio
 import aiosqlite # For asynchronous SQLite interaction
+from async_sqlite_pool import AsyncSQLitePool
 
 db_name = "users.db"
 
 # Asynchronous Database Functions
-async def async_fetch_users():
+async def async_fetch_users(pool: AsyncSQLitePool=None):
     """
     Asynchronously fetches all users from the 'users' table.
+    Args:
+        pool (AsyncSQLitePool, optional): Pool to borrow a reader from instead of opening a connection.
     Returns:
         list: A list of tuples, each representing a user row.
     """
+    if pool is not None:
+        return await pool.fetchall("SELECT * FROM users;")
     async with aiosqlite.connect(db_name) as db:
         async with db.execute("SELECT * FROM users;") as cursor:
             return await cursor.fetchall()
         
 
-async def async_fetch_older_users():
+async def async_fetch_older_users(pool: AsyncSQLitePool=None):
     """
     Asynchronously fetches users older than a specified age from the 'users' table.
     Args:
-        min_age (int): The minimum age for users to be fetched.
+        pool (AsyncSQLitePool, optional): Pool to borrow a reader from instead of opening a connection.
     Returns:
         list: A list of tuples, each representing a user row.
     """
+    if pool is not None:
+        return await pool.fetchall("SELECT * FROM users WHERE age > 40")
     async with aiosqlite.connect(db_name) as db:
         async with db.execute("SELECT * FROM users WHERE age > 40") as cursor:
             return await cursor.fetchall()
@@ -31,14 +38,16 @@ async def fetch_concurrently():
     """
     Executes multiple asynchronous database queries concurrently using asyncio.gather().
     Prints the results of each query.
+    The queries share one AsyncSQLitePool instead of each opening a connection (and thread).
     """
     
     print("--- Starting concurrent fetches ---")
-    # Use asyncio.gather to run tasks concurrently
-    all_users, older_users = await asyncio.gather(
-        async_fetch_users(),
-        async_fetch_older_users() # Fetch users older than 40
-    )
+    async with AsyncSQLitePool(db_name, readers=2) as pool:
+        # Use asyncio.gather to run tasks concurrently
+        all_users, older_users = await asyncio.gather(
+            async_fetch_users(pool),
+            async_fetch_older_users(pool) # Fetch users older than 40
+        )
 
     return all_users, older_users
 
@@ -0,0 +1,116 @@
+import os
+import asyncio
+import aiosqlite
+from contextlib import asynccontextmanager
+
+
+class AsyncSQLitePool:
+    """
+    A fixed pool of aiosqlite connections to one database file: `readers`
+    read-only connections shared by queries, plus a single writer connection
+    that serializes writes. Every aiosqlite connection runs on its own thread,
+    so a fan-out of hundreds of queries reuses at most readers + 1 threads
+    instead of starting one per query. The writer is only opened on first use,
+    so a read-only workload runs on `readers` threads.
+
+    Usage:
+        async with AsyncSQLitePool("users.db", readers=4) as pool:
+            rows = await pool.fetchall("SELECT * FROM users")
+    """
+    def __init__(self, db_name: str, readers: int=4):
+        """
+        Initializes the pool; connections are opened by open() or 'async with'.
+
+        Args:
+            db_name (str): The name of the SQLite database file.
+            readers (int): Number of read-only connections. Defaults to 4.
+        """
+        if readers < 1:
+            raise ValueError("readers must be at least 1")
+        self.db_name = db_name
+        self.readers = readers
+        self._idle_readers = None
+        self._all_readers = []
+        self._writer = None
+        self._writer_lock = None
+
+    async def open(self):
+        """
+        Opens the reader connections. If any of them fails to open, the
+        connections opened so far are closed before the error is raised.
+        """
+        self._writer_lock = asyncio.Lock()
+        self._idle_readers = asyncio.Queue()
+        try:
+            # Read-only connections can't create the file, so let the writer do it.
+            if not os.path.exists(self.db_name):
+                self._writer = await aiosqlite.connect(self.db_name)
+            for _ in range(self.readers):
+                conn = await aiosqlite.connect(f"file:{self.db_name}?mode=ro", uri=True)
+                self._all_readers.append(conn)
+                self._idle_readers.put_nowait(conn)
+        except BaseException:
+            await self.close()
+            raise
+        return self
+
+    async def close(self):
+        """
+        Closes every connection in the pool.
+        """
+        for conn in self._all_readers:
+            await conn.close()
+        self._all_readers = []
+        if self._writer is not None:
+            await self._writer.close()
+            self._writer = None
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    @asynccontextmanager
+    async def reader(self):
+        """
+        Borrows a read-only connection, waiting for one to be free, and returns it afterwards.
+        """
+        conn = await self._idle_readers.get()
+        try:
+            yield conn
+        finally:
+            self._idle_readers.put_nowait(conn)
+
+    @asynccontextmanager
+    async def writer(self):
+        """
+        Borrows the writer connection exclusively, opening it on first use;
+        commits on success, rolls back on error.
+        """
+        async with self._writer_lock:
+            if self._writer is None:
+                self._writer = await aiosqlite.connect(self.db_name)
+            try:
+                yield self._writer
+            except BaseException:
+                await self._writer.rollback()
+                raise
+            else:
+                await self._writer.commit()
+
+    async def fetchall(self, query: str, params: tuple=()):
+        """
+        Runs a read query on a pooled reader and returns all rows.
+        """
+        async with self.reader() as db:
+            async with db.execute(query, params) as cursor:
+                return await cursor.fetchall()
+
+    async def execute(self, query: str, params: tuple=()):
+        """
+        Runs a write statement on the writer connection and commits it. Returns the rowcount.
+        """
+        async with self.writer() as db:
+            async with db.execute(query, params) as cursor:
+                return cursor.rowcount
@@ -1,6 +1,22 @@
 import mysql.connector as connector
 from mysql.connector import Error
-from typing import Any
+from collections import OrderedDict
+from itertools import islice
+from typing import Any, Iterable, Iterator
+
+class PipelineError(Error):
+    """
+        Raised by ExecuteQuery.execute_pipeline when one of its statements fails.
+
+        Attributes:
+            index (int): Position of the failing statement.
+            results (list[list[tuple]]): Results of the statements that ran before it.
+    """
+    def __init__(self, index: int, results: list[list[tuple]], error: Error) -> None:
+        super().__init__(msg=f"Pipeline statement {index} failed: {error}")
+        self.index = index
+        self.results = results
+
 
 class ExecuteQuery:
     """
@@ -11,7 +27,8 @@ class ExecuteQuery:
                 cursor.execute("SELECT * FROM users;")
                 rows = cursor.fetchall()
         """
-    def __init__(self, db_name: str, db_user: str, db_password: str, db_port: int=3306, db_host: str='localhost') -> None:
+    def __init__(self, db_name: str, db_user: str, db_password: str, db_port: int=3306, db_host: str='localhost',
+                 statement_cache_size: int=32) -> None:
 
         """
             Initialize the DatabaseConnection object with connection details.
@@ -23,6 +40,8 @@ class ExecuteQuery:
                 query (str): Query to execute
                 db_port (int, optional): Port number for MySQL. Defaults to 3306.
                 db_host (str, optional): Hostname or IP address. Defaults to 'localhost'.
+                statement_cache_size (int, optional): Server-side prepared statements kept per
+                    connection, 0 disables them. Defaults to 32.
         """
 
         self.db_name = db_name
@@ -30,6 +49,10 @@ class ExecuteQuery:
         self.db_password = db_password
         self.db_port = db_port
         self.db_host = db_host
+        self.statement_cache_size = statement_cache_size
+        self.statements = OrderedDict()  # SQL text -> prepared cursor, least recently used first
+        self.statement_hits = 0
+        self.statement_misses = 0
 
         return
 
@@ -71,6 +94,7 @@ class ExecuteQuery:
         """
 
         if self.cnx and self.cnx.is_connected():
+            self.close_statements()
             self.cnx.commit()
             self.cnx.close()
             print(f"Connection to {self.db_name} closed successfully.")
@@ -83,6 +107,10 @@ class ExecuteQuery:
         """
         Execute a query with optional parameters.
 
+        Queries with parameters run on a cached prepared statement (see prepared_cursor),
+        except those containing '%%': prepared cursors send it to the server unchanged
+        instead of as a literal '%', so those use the regular cursor.
+
         Args:
             query (str): SQL query string.
             parameters (Optional[Tuple[Any]]): Parameters to substitute in query.
@@ -94,16 +122,178 @@ class ExecuteQuery:
             print("No cursor")
             raise RuntimeError("Cursor is not initialized.")
 
+        cursor = self.cursor
         if parameters:
             print("Paramters present")
-            self.cursor.execute(query, parameters)
+            if self.statement_cache_size > 0 and "%%" not in query:
+                cursor = self.prepared_cursor(query)
+            cursor.execute(query, parameters)
         else:
-            self.cursor.execute(query)
+            cursor.execute(query)
 
         if query.strip().upper().startswith("SELECT"):
-            return self.cursor.fetchall()
+            return cursor.fetchall()
         return []
 
+    def iter_query(self, query: str, parameters: tuple[Any, ...]|None = None,
+                   chunk_size: int|None = None) -> Iterator[tuple]|Iterator[list[tuple]]:
+        """
+        Execute a query and lazily yield its rows instead of materializing them.
+
+        Rows are read from the server through an unbuffered cursor as the caller
+        iterates, so memory stays constant however large the result set is. Must
+        be consumed inside the `with` block. If iteration stops early, the rest of
+        the result is discarded so the connection can run the next query.
+
+        Args:
+            query (str): SQL query string.
+            parameters (Optional[Tuple[Any]]): Parameters to substitute in query.
+            chunk_size (Optional[int]): Yield lists of up to chunk_size rows instead of single rows.
+
+        Yields:
+            tuple | list[tuple]: One row, or one chunk of rows when chunk_size is set.
+        """
+        if not self.cnx:
+            raise RuntimeError("Connection is not initialized.")
+
+        cursor = self.cnx.cursor(buffered=False)
+        exhausted = False
+        try:
+            cursor.execute(query, parameters or ())
+            if chunk_size is None:
+                yield from cursor
+            else:
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield rows
+            exhausted = True
+        finally:
+            if not exhausted and self.cnx.unread_result:
+                self.cnx.consume_results()  # drop the unread rows still on the wire
+            cursor.close()
+
+    def execute_many(self, query: str, param_iter: Iterable[tuple[Any, ...]], batch_size: int=1000) -> int:
+        """
+        Execute one statement for every parameter tuple, batch_size tuples per executemany call.
+
+        Parameters are consumed lazily, so param_iter may be a generator. Only INSERT and
+        REPLACE ... VALUES statements are folded by the connector into one multi-row
+        statement per batch (one round trip); other statements such as UPDATE or DELETE
+        still cost one round trip per tuple.
+
+        Args:
+            query (str): SQL statement with placeholders.
+            param_iter (Iterable[tuple[Any, ...]]): Parameter tuples, one per execution.
+            batch_size (int, optional): Tuples sent per executemany call. Defaults to 1000.
+
+        Returns:
+            int: Total number of affected rows.
+        """
+        if not self.cursor:
+            raise RuntimeError("Cursor is not initialized.")
+
+        params = iter(param_iter)
+        affected = 0
+        while True:
+            batch = list(islice(params, batch_size))
+            if not batch:
+                break
+            self.cursor.executemany(query, batch)
+            affected += max(self.cursor.rowcount, 0)
+        return affected
+
+    def execute_pipeline(self, statements: list[tuple[str, tuple[Any, ...]|None]]) -> list[list[tuple]]:
+        """
+        Send several independent statements in one round trip and collect all results.
+
+        The statements are joined into a single multi-statement request; their results
+        come back in order. The request runs on the regular (not prepared) cursor, so
+        percent signs follow its rules: write a literal percent sign as '%' in statements
+        without parameters and as '%%' in statements with parameters.
+
+        Args:
+            statements (list[tuple[str, Optional[tuple]]]): (query, parameters) pairs.
+
+        Returns:
+            list[list[tuple]]: One result per statement; empty for statements returning no rows.
+
+        Raises:
+            PipelineError: If a statement fails. Its `index` is the failing statement and
+                `results` holds the results of the statements before it, which have run.
+        """
+        if not self.cursor:
+            raise RuntimeError("Cursor is not initialized.")
+        if not statements:
+            return []
+
+        parameters = tuple(value for _, params in statements for value in (params or ()))
+        queries = []
+        for query, params in statements:
+            query = query.strip().rstrip(";")
+            if parameters and not params:
+                query = query.replace("%", "%%")  # the whole request goes through one substitution
+            queries.append(query)
+        operation = ";\n".join(queries)
+
+        results = []
+        try:
+            for result in self.cursor.execute(operation, parameters or None, multi=True):
+                results.append(result.fetchall() if result.with_rows else [])
+        except Error as e:
+            # Drop whatever is left of the request so the connection stays usable.
+            if self.cnx.unread_result:
+                self.cnx.consume_results()
+            raise PipelineError(len(results), results, e) from e
+        return results
+
+    def prepared_cursor(self, query: str) -> connector.cursor.MySQLCursorPrepared:
+        """
+        Return the prepared-statement cursor for a query, preparing it on first use.
+
+        Each cursor holds one server-side prepared statement, so executing the same
+        SQL text again skips MySQL's parse and plan. Only the `statement_cache_size`
+        most recently used statements are kept; older ones are deallocated.
+
+        Args:
+            query (str): SQL query string.
+
+        Returns:
+            MySQLCursorPrepared: Cursor bound to the prepared statement.
+        """
+        cursor = self.statements.get(query)
+        if cursor is not None:
+            self.statements.move_to_end(query)
+            self.statement_hits += 1
+            return cursor
+
+        self.statement_misses += 1
+        cursor = self.cnx.cursor(prepared=True)
+        self.statements[query] = cursor
+        while len(self.statements) > self.statement_cache_size:
+            _, evicted = self.statements.popitem(last=False)
+            evicted.close()  # deallocates the statement on the server
+        return cursor
+
+    def close_statements(self) -> None:
+        """
+        Deallocate every cached prepared statement.
+        """
+        while self.statements:
+            _, cursor = self.statements.popitem()
+            cursor.close()
+
+    def statement_cache_info(self) -> dict[str, int]:
+        """
+        Return prepared statement cache hits, misses and current size.
+        """
+        return {
+            'hits': self.statement_hits,
+            'misses': self.statement_misses,
+            'size': len(self.statements),
+        }
+
 user = 'prodev'
 password = 'password123'
 host = 'localhost'
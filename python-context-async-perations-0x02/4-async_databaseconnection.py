@@ -0,0 +1,181 @@
+import aiomysql
+import asyncio
+import hashlib
+from typing import Any
+
+class AsyncDatabaseConnection:
+    """
+        Async context manager that checks a MySQL connection out of a shared pool.
+
+        Connections come from an aiomysql pool shared by every instance with the same
+        host, port, user, password, database, pool settings and event loop, so a request
+        handler borrows a warm connection instead of paying a MySQL handshake. On exit the transaction is
+        committed (or rolled back if the block raised) and the connection goes back
+        to the pool.
+
+        Example usage:
+            async with AsyncDatabaseConnection('db_name', 'user', 'password') as cursor:
+                await cursor.execute("SELECT * FROM users;")
+                rows = await cursor.fetchall()
+        """
+    _pools: dict[tuple, aiomysql.Pool] = {}
+    _pool_locks: dict[asyncio.AbstractEventLoop, asyncio.Lock] = {}
+
+    def __init__(self, db_name: str, db_user: str, db_password: str, db_port: int=3306, db_host: str='localhost',
+                 min_size: int=1, max_size: int=10, acquire_timeout: float=10.0, recycle: int=3600) -> None:
+
+        """
+            Initialize the AsyncDatabaseConnection object with connection and pool details.
+
+            Args:
+                db_name (str): Name of the database to connect to.
+                db_user (str): Username for authentication.
+                db_password (str): Password for authentication.
+                db_port (int, optional): Port number for MySQL. Defaults to 3306.
+                db_host (str, optional): Hostname or IP address. Defaults to 'localhost'.
+                min_size (int, optional): Connections the pool keeps open. Defaults to 1.
+                max_size (int, optional): Upper bound on pooled connections. Defaults to 10.
+                acquire_timeout (float, optional): Seconds to wait for a free connection. Defaults to 10.
+                recycle (int, optional): Seconds after which a pooled connection is reopened. Defaults to 3600.
+        """
+
+        self.db_name = db_name
+        self.db_user = db_user
+        self.db_password = db_password
+        self.db_port = db_port
+        self.db_host = db_host
+        self.min_size = min_size
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.recycle = recycle
+        self.pool = None
+        self.cnx = None
+        self.cursor = None
+
+        return
+
+    async def _get_pool(self) -> aiomysql.Pool:
+        """
+            Return the shared pool for this database, creating it on first use.
+
+            Returns:
+                aiomysql.Pool: Pool bound to the running event loop.
+        """
+        loop = asyncio.get_running_loop()
+        # Only a digest of the password goes into the key, which lives as long as the pool
+        password_digest = hashlib.sha256(self.db_password.encode()).hexdigest()
+        key = (self.db_host, self.db_port, self.db_user, password_digest, self.db_name,
+               self.min_size, self.max_size, self.recycle, loop)
+        pool = AsyncDatabaseConnection._pools.get(key)
+        if pool is not None:
+            return pool
+
+        # asyncio locks belong to one event loop, so keep one per loop
+        lock = AsyncDatabaseConnection._pool_locks.setdefault(loop, asyncio.Lock())
+        async with lock:
+            pool = AsyncDatabaseConnection._pools.get(key)
+            if pool is None:
+                print(f"Creating pool for {self.db_name} at {self.db_host}:{self.db_port} as user {self.db_user}")
+                pool = await aiomysql.create_pool(
+                    host=self.db_host,
+                    port=self.db_port,
+                    user=self.db_user,
+                    password=self.db_password,
+                    db=self.db_name,
+                    minsize=self.min_size,
+                    maxsize=self.max_size,
+                    pool_recycle=self.recycle,
+                )
+                AsyncDatabaseConnection._pools[key] = pool
+        return pool
+
+    async def __aenter__(self) -> aiomysql.Cursor:
+        """
+            Check a connection out of the pool and return a cursor.
+
+            Returns:
+                aiomysql.Cursor: Cursor object to execute queries.
+
+            Raises:
+                asyncio.TimeoutError: If no connection frees up within acquire_timeout.
+        """
+        try:
+            self.pool = await self._get_pool()
+            self.cnx = await asyncio.wait_for(self.pool.acquire(), self.acquire_timeout)
+        except aiomysql.Error as e:
+            print(f'Error connecting to Database {self.db_name} on {self.db_host}: {e}')
+            raise
+
+        try:
+            self.cursor = await self.cnx.cursor()
+        except BaseException:
+            # __aexit__ doesn't run when __aenter__ fails, so hand the connection back here
+            self.pool.release(self.cnx)
+            self.cnx = None
+            raise
+        return self.cursor
+
+    async def __aexit__(self, exc_type: type|None, exc_value: BaseException|None, exc_traceback: Any|None) -> bool:
+        """
+            Commit (or roll back on error) and return the connection to the pool.
+
+            Args:
+                exc_type (Optional[type]): Exception type if raised.
+                exc_value (Optional[BaseException]): Exception value if raised.
+                exc_traceback (Optional[Any]): Traceback object.
+
+            Returns:
+                bool: Always False so exceptions raised in the block propagate.
+        """
+        if self.cnx is None:
+            return False
+
+        try:
+            if self.cursor is not None:
+                await self.cursor.close()
+            if exc_type is None:
+                await self.cnx.commit()
+            else:
+                await self.cnx.rollback()
+        finally:
+            self.pool.release(self.cnx)
+            self.cnx = None
+            self.cursor = None
+        return False  # Do not suppress exceptions
+
+    @classmethod
+    async def close_pools(cls) -> None:
+        """
+            Close every pool created on the running event loop and wait for their connections to close.
+        """
+        loop = asyncio.get_running_loop()
+        for key in [key for key in cls._pools if key[-1] is loop]:
+            pool = cls._pools.pop(key)
+            pool.close()
+            await pool.wait_closed()
+        cls._pool_locks.pop(loop, None)
+
+user = 'prodev'
+password = 'password123'
+host = 'localhost'
+database = 'ALX_prodev'
+
+
+async def fetch_users() -> list[tuple]:
+    async with AsyncDatabaseConnection(database, user, password) as cursor:
+        await cursor.execute("SELECT * FROM users;")
+        return await cursor.fetchall()
+
+
+async def main() -> None:
+    # Both requests borrow from the same pool instead of opening their own connections
+    try:
+        results = await asyncio.gather(fetch_users(), fetch_users())
+        for result in results:
+            print(result)
+    finally:
+        await AsyncDatabaseConnection.close_pools()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
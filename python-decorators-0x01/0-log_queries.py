@@ -1,5 +1,15 @@
+import re
+import json
+import math
+import time
+import threading
+import queue
+import random
 import sqlite3
+import logging
 import functools
+import logging.handlers
+from collections import deque
 from datetime import datetime
 
 def log_queries(func):
@@ -28,6 +38,242 @@ def log_queries(func):
     return wrapper
 
 
+# Logger for structured query records; handlers are attached by setup_query_logging.
+query_logger = logging.getLogger('queries')
+
+# Quoted strings, numbers (incl. hex) and runs of whitespace, in that order.
+SQL_LITERAL = re.compile(r"'(?:[^']|'')*'|\b0x[0-9a-fA-F]+\b|\b\d+(?:\.\d+)?\b|\s+")
+# Comparison and additive operators and commas, with whatever spacing surrounds them.
+OPERATOR = re.compile(r"\s*(<=|>=|<>|!=|==|=|<|>)\s*")
+ADDITIVE = re.compile(r"\s*([-+])\s*")
+COMMA = re.compile(r"\s*,\s*")
+# The sign of a literal: a + or - right before a ? where no operand precedes it.
+SIGNED_LITERAL = re.compile(
+    r"(^|[=<>(,]|\b(?:AND|OR|NOT|BETWEEN|WHEN|THEN|ELSE|SELECT|WHERE|LIMIT|OFFSET)\b)( ?)[-+] ?(?=\?)",
+    re.IGNORECASE,
+)
+IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+
+
+def fingerprint(query: str) -> str:
+    """
+    Reduce a SQL statement to its shape: literals (with their sign) become '?',
+    IN lists collapse to IN (?...), whitespace is collapsed, comparison and
+    +/- operators get one space on each side, commas one after, and keywords are
+    upper-cased, so statements differing only in values or spacing share one
+    fingerprint.
+    """
+    def replace(match):
+        return ' ' if match.group().isspace() else '?'
+
+    shape = SQL_LITERAL.sub(replace, query).strip().rstrip(';').rstrip().upper()
+    shape = COMMA.sub(', ', OPERATOR.sub(r' \1 ', shape))
+    shape = ADDITIVE.sub(r' \1 ', SIGNED_LITERAL.sub(r'\1\2', shape))
+    return IN_LIST.sub('IN (?...)', shape)
+
+
+def _percentile(sorted_values: list, fraction: float) -> float:
+    # Nearest-rank percentile of an already sorted, non-empty list
+    rank = max(math.ceil(fraction * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+class _FingerprintStats:
+    # Running totals for one fingerprint plus a window of recent durations for percentiles
+    def __init__(self, window: int):
+        self.count = 0
+        self.total_ms = 0.0
+        self.rows_total = 0
+        self.errors = 0
+        self.recent_ms = deque(maxlen=window)
+
+
+class QueryStatsRegistry:
+    """
+    A thread-safe, process-wide table of per-fingerprint query statistics.
+
+    Counts, total latency and row counts are exact; p50/p95/p99 are computed
+    over the most recent `window` durations of each fingerprint so memory
+    stays bounded for hot queries.
+    """
+
+    def __init__(self, window: int=1024):
+        """
+        Args:
+            window (int): Recent durations kept per fingerprint for percentiles (default: 1024).
+        """
+        self.window = window
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def record(self, fingerprint: str, duration_ms: float, rows: int|None=None, failed: bool=False) -> None:
+        with self._lock:
+            stats = self._stats.get(fingerprint)
+            if stats is None:
+                stats = self._stats[fingerprint] = _FingerprintStats(self.window)
+            stats.count += 1
+            stats.total_ms += duration_ms
+            stats.rows_total += rows or 0
+            stats.errors += failed
+            stats.recent_ms.append(duration_ms)
+
+    def snapshot(self) -> dict:
+        """
+        Returns:
+            dict: fingerprint -> {count, errors, total_ms, mean_ms, p50_ms, p95_ms, p99_ms, rows_total, rows_mean},
+            ordered by total_ms, hottest first.
+        """
+        with self._lock:
+            copied = [(fp, s.count, s.errors, s.total_ms, s.rows_total, sorted(s.recent_ms)) for fp, s in self._stats.items()]
+
+        result = {}
+        for fp, count, errors, total_ms, rows_total, recent in sorted(copied, key=lambda item: item[3], reverse=True):
+            result[fp] = {
+                'count': count,
+                'errors': errors,
+                'total_ms': round(total_ms, 3),
+                'mean_ms': round(total_ms / count, 3),
+                'p50_ms': round(_percentile(recent, 0.50), 3),
+                'p95_ms': round(_percentile(recent, 0.95), 3),
+                'p99_ms': round(_percentile(recent, 0.99), 3),
+                'rows_total': rows_total,
+                'rows_mean': round(rows_total / count, 3),
+            }
+        return result
+
+    def to_json(self, indent: int|None=2) -> str:
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def dump_json(self, path: str) -> None:
+        """
+        Write the current snapshot to `path` as JSON.
+        """
+        with open(path, 'w') as file:
+            file.write(self.to_json())
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+# Process-wide statistics fed by log_queries_structured.
+query_stats = QueryStatsRegistry()
+
+
+# (QueueHandler, QueueListener) installed by the last setup_query_logging call.
+_query_logging = None
+
+
+def setup_query_logging(handler: logging.Handler|None=None, level: int=logging.INFO) -> logging.handlers.QueueListener:
+    """
+    Route query_logger through a QueueHandler so callers only enqueue records;
+    a background QueueListener thread formats them and writes them to `handler`
+    (a stderr StreamHandler by default).
+
+    Calling it again replaces the previous setup: its QueueHandler is removed
+    and its listener stopped after flushing, so records are never written twice.
+
+    Returns:
+        QueueListener: The started listener; call stop() on shutdown to flush it.
+    """
+    global _query_logging
+    if _query_logging is not None:
+        previous_handler, previous_listener = _query_logging
+        query_logger.removeHandler(previous_handler)
+        if previous_listener._thread is not None:  # not already stopped by the caller
+            previous_listener.stop()
+
+    records = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(records)
+    query_logger.addHandler(queue_handler)
+    query_logger.setLevel(level)
+    query_logger.propagate = False
+
+    listener = logging.handlers.QueueListener(records, handler or logging.StreamHandler(), respect_handler_level=True)
+    listener.start()
+    _query_logging = (queue_handler, listener)
+    return listener
+
+
+def log_queries_structured(sample_rate: float=1.0, slow_query_ms: float|None=500.0, logger: logging.Logger=query_logger,
+                           registry: QueryStatsRegistry|None=query_stats):
+    """
+    A decorator factory that times each query and emits one structured record
+    per call through `logger` instead of printing.
+
+    Each record carries, as `extra` attributes: fingerprint, params_count,
+    duration_ms, rows and error (the exception class name, or None). Calls are
+    logged at INFO for a `sample_rate` fraction of calls, while calls slower
+    than `slow_query_ms` are always logged at WARNING and failed calls at ERROR.
+    Use setup_query_logging so emitting never blocks on I/O.
+
+    Every call, sampled or not and failed or not, is also added to `registry`
+    under its fingerprint.
+
+    Args:
+        sample_rate (float): Fraction of normal calls to log, between 0 and 1 (default: 1.0).
+        slow_query_ms (float | None): Duration above which a call is always logged, None to disable (default: 500).
+        logger (logging.Logger): Where records go (default: the 'queries' logger).
+        registry (QueryStatsRegistry | None): Aggregated statistics, None to skip (default: query_stats).
+
+    Returns:
+        callable: A decorator that can be applied to a function.
+    """
+    def decorator_log_queries_structured(func):
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            query = kwargs.get('query') or (args[0] if args else None)
+            if query is None:
+                return func(*args, **kwargs)
+
+            result = None
+            error = None
+            started = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+                return result
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                duration_ms = (time.perf_counter() - started) * 1000
+                _log_call(query, args, kwargs, result, error, duration_ms)
+
+        def _log_call(query, args, kwargs, result, error, duration_ms):
+            rows = len(result) if isinstance(result, (list, tuple)) else None
+            shape = fingerprint(query)
+            if registry is not None:
+                registry.record(shape, duration_ms, rows, failed=error is not None)
+
+            slow = slow_query_ms is not None and duration_ms >= slow_query_ms
+            if error is None and not slow and (sample_rate <= 0 or random.random() >= sample_rate):
+                return
+
+            params = kwargs.get('params', args[1] if len(args) > 1 else None)
+            if params is None:
+                params_count = 0
+            elif isinstance(params, (list, tuple, dict)):
+                params_count = len(params)
+            else:
+                params_count = 1  # a bare scalar bound as the only parameter
+            record = {
+                'fingerprint': shape,
+                'params_count': params_count,
+                'duration_ms': round(duration_ms, 3),
+                'rows': rows,
+                'error': type(error).__name__ if error is not None else None,
+            }
+            if error is not None:
+                logger.log(logging.ERROR, "failed query %.3f ms (%s): %s", duration_ms, record['error'],
+                           shape, extra=record)
+            else:
+                logger.log(logging.WARNING if slow else logging.INFO,
+                           "%s query %.3f ms: %s", "slow" if slow else "sql", duration_ms, shape, extra=record)
+        return wrapper
+    return decorator_log_queries_structured
+
+
 @log_queries
 def fetch_all_users(query):
     conn = sqlite3.connect('users.db')
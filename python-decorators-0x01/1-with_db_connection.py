@@ -1,5 +1,10 @@
-import sqlite3
 import functools
+from db_pool import ConnectionPool, connect, with_pooled_connection
+
+# Pragmas applied to every connection opened by with_db_connection.
+# None keeps SQLite defaults; set to db_pool.WAL_PROFILE to opt in to WAL, which is
+# persisted in the database file and so affects every other user of users.db.
+connection_profile = None
 
 
 def with_db_connection(func):
@@ -9,10 +14,11 @@ def with_db_connection(func):
     It establishes a connection to 'users.db', passes this connection object
     as the first argument to the decorated function, and ensures the connection
     is closed upon the function's completion, regardless of success or failure.
+    The module-level `connection_profile` is applied to the connection on open.
     """
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        conn = sqlite3.connect('users.db') 
+        conn = connect('users.db', connection_profile) 
         try:
             return func(conn, *args, **kwargs) 
         finally:
@@ -20,7 +26,11 @@ def with_db_connection(func):
     return wrapper
 
 
-@with_db_connection
+# Shared pool of warm connections for hot lookups; opens nothing until first used
+users_db_pool = ConnectionPool('users.db', min_size=1, max_size=5)
+
+
+@with_pooled_connection(users_db_pool)
 def get_user_by_id(conn, user_id):
     cursor = conn.cursor()
     cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
@@ -1,5 +1,10 @@
+import time
+import queue
 import sqlite3
 import functools
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from query_invalidation import invalidate_tables, track_written_tables
 
 def with_db_connection(func):
     """
@@ -21,13 +26,19 @@ def with_db_connection(func):
 
 # transaction management
 def transactional(func):
-    
+    """
+    A decorator that commits the wrapped function's changes on success and rolls
+    them back on error. After a commit, caches registered with query_invalidation
+    (e.g. cache_query) are told which tables were written.
+    """
     @functools.wraps(func)
     def wrapper(conn, *args, **kwargs):
         try:
-            result = func(conn, *args, **kwargs) # Execute the wrapped function
+            with track_written_tables(conn) as written:
+                result = func(conn, *args, **kwargs) # Execute the wrapped function
             conn.commit() # Commit changes on success
             print("[TRANSACTION] Committed successfully.")
+            invalidate_tables(written) # Drop cached reads of the tables we changed
             return result
         except Exception as e:
             conn.rollback() # Rollback on error
@@ -36,6 +47,214 @@ def transactional(func):
     return wrapper
 
 
+class GroupCommitter:
+    """
+    Combines transactional calls that arrive close together into one SQLite transaction.
+
+    A single writer thread owns the connection. It takes the first queued call,
+    gathers whatever else arrives within `window` seconds (up to `max_batch`
+    calls), runs each inside its own SAVEPOINT and then COMMITs once, so a
+    burst of writes pays for one fsync instead of one each. A call that raises
+    is rolled back to its savepoint without affecting the others in the batch.
+    Callers block until the batch has been committed.
+
+    If the writer thread stops (close() or an unexpected failure), queued calls
+    fail and later submit() calls raise instead of waiting forever.
+    """
+
+    def __init__(self, database: str='users.db', window: float=0.005, max_batch: int=64, timeout: float|None=30.0):
+        """
+        Args:
+            database (str): Path of the SQLite database file (default: 'users.db').
+            window (float): Seconds to wait for more calls after the first one (default: 0.005).
+            max_batch (int): Maximum number of calls in one transaction (default: 64).
+            timeout (float | None): Seconds submit() waits for its result, None waits forever (default: 30).
+        """
+        self.database = database
+        self.window = window
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self._jobs = queue.Queue()
+        self._state_lock = threading.Lock()
+        self._stopped_error = None  # set once the writer no longer accepts calls
+        self._conn = None
+        self._writer = threading.Thread(target=self._run, daemon=True)
+        self._writer.start()
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Run func(conn, *args, **kwargs) in the next group transaction and return its result
+        once that transaction has committed, or raise the error it raised.
+
+        Calls made from inside a batched call (i.e. on the writer thread) run inline in
+        the current transaction under a nested savepoint.
+
+        Raises:
+            sqlite3.OperationalError: If the committer is closed or its writer thread failed.
+            TimeoutError: If no result arrives within `timeout`. A call that had already
+                started may still commit afterwards; one that had not is cancelled.
+        """
+        if threading.current_thread() is self._writer:
+            return self._run_nested(func, args, kwargs)
+
+        future = Future()
+        with self._state_lock:
+            if self._stopped_error is not None:
+                raise self._stopped_error
+            self._jobs.put((future, func, args, kwargs))
+
+        try:
+            return future.result(self.timeout)
+        except FutureTimeoutError:
+            started = not future.cancel()
+            raise TimeoutError(
+                f"Group transaction did not {'commit' if started else 'start'} within {self.timeout} seconds"
+            ) from None
+
+    def close(self) -> None:
+        """
+        Finish the queued calls and stop the writer thread.
+        """
+        with self._state_lock:
+            if self._stopped_error is None:
+                self._stopped_error = sqlite3.OperationalError("Group committer is closed")
+                self._jobs.put(None)
+        self._writer.join()
+
+    def _collect(self, first) -> list:
+        # Gather calls arriving within the window after `first`
+        batch = [first]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                job = self._jobs.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if job is None:
+                self._jobs.put(None)  # let _run see the stop signal after this batch
+                break
+            batch.append(job)
+        return batch
+
+    def _run(self) -> None:
+        try:
+            self._conn = sqlite3.connect(self.database, isolation_level=None)  # we issue BEGIN/COMMIT ourselves
+            while True:
+                first = self._jobs.get()
+                if first is None:
+                    break
+                self._run_batch(self._conn, self._collect(first))
+        except BaseException as e:
+            print(f"[TRANSACTION] Group committer stopped due to error: {e}")
+            error = sqlite3.OperationalError(f"Group committer failed: {e}")
+            error.__cause__ = e
+            with self._state_lock:
+                if self._stopped_error is None:
+                    self._stopped_error = error
+        finally:
+            # Fail whatever is still queued so no caller waits forever
+            with self._state_lock:
+                while True:
+                    try:
+                        job = self._jobs.get_nowait()
+                    except queue.Empty:
+                        break
+                    if job is not None:
+                        self._resolve(job[0], error=self._stopped_error)
+            if self._conn is not None:
+                self._conn.close()
+
+    @staticmethod
+    def _resolve(future, result=None, error=None) -> None:
+        # Settle a future unless its caller already gave up on it
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def _run_nested(self, func, args, kwargs):
+        # A batched call invoking another group_transactional function: run it right here
+        conn = self._conn
+        conn.execute("SAVEPOINT nested_call")
+        try:
+            result = func(conn, *args, **kwargs)
+        except BaseException:
+            conn.execute("ROLLBACK TO nested_call")
+            conn.execute("RELEASE nested_call")
+            raise
+        conn.execute("RELEASE nested_call")
+        return result
+
+    def _run_batch(self, conn, batch) -> None:
+        outcomes = []
+        written = set()
+        try:
+            conn.execute("BEGIN")
+            with track_written_tables(conn) as written:
+                self._run_calls(conn, batch, outcomes)
+            conn.execute("COMMIT")
+            print(f"[TRANSACTION] Group of {len(batch)} committed successfully.")
+        except BaseException as e:
+            try:
+                if conn.in_transaction:
+                    conn.rollback()
+            finally:
+                print(f"[TRANSACTION] Group of {len(batch)} rolled back due to error: {e}")
+                for future, _, _, _ in batch:
+                    self._resolve(future, error=e)
+            if not isinstance(e, Exception):
+                raise  # the writer itself is being torn down
+            return
+
+        invalidate_tables(written) # Drop cached reads of the tables this batch changed
+        for future, result, error in outcomes:
+            if error is not None:
+                print(f"[TRANSACTION] Call rolled back due to error: {error}")
+            self._resolve(future, result, error)
+
+    def _run_calls(self, conn, batch, outcomes) -> None:
+        # Run each call of the batch in its own savepoint, collecting (future, result, error)
+        for future, func, args, kwargs in batch:
+            if not future.set_running_or_notify_cancel():
+                continue  # caller timed out before we got to it
+            conn.execute("SAVEPOINT call")
+            try:
+                result = func(conn, *args, **kwargs)
+            except BaseException as e:
+                conn.execute("ROLLBACK TO call") # Undo only this call's changes
+                conn.execute("RELEASE call")
+                outcomes.append((future, None, e))
+            else:
+                conn.execute("RELEASE call")
+                outcomes.append((future, result, None))
+
+
+def group_transactional(committer: GroupCommitter):
+    """
+    A decorator factory that replaces @with_db_connection/@transactional with group
+    commit: each call runs on the committer's connection inside its own savepoint
+    and returns once the shared transaction has committed.
+
+    Args:
+        committer (GroupCommitter): The group committer that runs the calls.
+
+    Returns:
+        callable: A decorator that can be applied to a function.
+    """
+    def decorator_group_transactional(func):
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return committer.submit(func, *args, **kwargs)
+        return wrapper
+    return decorator_group_transactional
+
+
 @with_db_connection
 @transactional
 def update_user_email(conn, user_id, new_email):
@@ -1,6 +1,9 @@
 import time
+import random
+import asyncio
 import sqlite3 
 import functools
+import threading
 
 
 def with_db_connection(func):
@@ -21,15 +24,83 @@ def with_db_connection(func):
     return wrapper
 
 
-# Decorator for transaction management
-def retry_on_failure(retries: int=3, delay: int=2):
+# Substrings of sqlite3 error messages that mean "try again later" rather than "this will never work".
+TRANSIENT_ERROR_MESSAGES = ('database is locked', 'database table is locked', 'database is busy')
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """
+    Classify an exception as retryable: only sqlite3.OperationalErrors caused by
+    lock contention are; syntax errors, constraint violations etc. are not.
+    """
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    message = str(error).lower()
+    return any(text in message for text in TRANSIENT_ERROR_MESSAGES)
+
+
+class RetryBudget:
+    """
+    A process-wide token bucket that caps retries relative to successful calls.
+
+    Each retry spends one token and each successful call earns `ratio` tokens,
+    up to `max_tokens`. While the bucket is empty failures are raised instead of
+    retried, so an outage can't multiply load with a storm of retries.
+    """
+
+    def __init__(self, ratio: float=0.2, max_tokens: float=10.0):
+        """
+        Args:
+            ratio (float): Tokens earned per successful call (default: 0.2, i.e. one retry per five successes).
+            max_tokens (float): Bucket capacity, also its starting level (default: 10).
+        """
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._lock = threading.Lock()
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._tokens = min(self._tokens + self.ratio, self.max_tokens)
+
+    def try_spend(self) -> bool:
+        """
+        Take one token for a retry. Returns False when the budget is exhausted.
+        """
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+# Shared by every retry_on_failure decorator unless another budget is passed in.
+retry_budget = RetryBudget()
+
+
+def backoff_delay(attempt: int, delay: float, max_delay: float, jitter: bool=True) -> float:
+    """
+    Exponential backoff with full jitter: a random wait between 0 and
+    min(max_delay, delay * 2 ** attempt), so workers that failed together
+    don't all retry at the same moment.
+    """
+    ceiling = min(max_delay, delay * (2 ** attempt))
+    return random.uniform(0, ceiling) if jitter else ceiling
+
+
+def retry_on_failure(retries: int=3, delay: float=2, max_delay: float=30, jitter: bool=True,
+                     retryable=is_transient_error, budget: RetryBudget|None=retry_budget):
     """
     A decorator factory that retries the decorated function a specified number of times
-    if a sqlite3.Error occurs.
+    if a retryable sqlite3.Error occurs, waiting with exponential backoff and full jitter.
 
     Args:
-        retries (int): The maximum number of times to retry the function (default: 3).
-        delay (int): The delay in seconds between retries (default: 2).
+        retries (int): The maximum number of attempts (default: 3).
+        delay (float): Base delay in seconds, doubled on every retry (default: 2).
+        max_delay (float): Upper bound on a single delay in seconds (default: 30).
+        jitter (bool): Randomise each delay between 0 and its backoff ceiling (default: True).
+        retryable (callable): Predicate deciding which errors are retried (default: is_transient_error).
+        budget (RetryBudget | None): Retry budget to draw from, None for unlimited (default: retry_budget).
 
     Returns:
         callable: A decorator that can be applied to a function.
@@ -40,15 +111,51 @@ def retry_on_failure(retries: int=3, delay: int=2):
         def wrapper(*args, **kwargs):
             for attempt in range(retries):
                 try:
-                    return func(*args, **kwargs) # Attempt to execute the function
+                    result = func(*args, **kwargs) # Attempt to execute the function
                 except sqlite3.Error as e:
-                    print(f"Attempt {attempt + 1}/{retries} failed with error: {e}. Retrying in {delay} seconds...")
-                    time.sleep(delay) # Wait before the next retry
-            raise # Re-raise the last exception if all retries fail
+                    last_attempt = attempt + 1 >= retries
+                    if last_attempt or not retryable(e) or (budget is not None and not budget.try_spend()):
+                        raise # Give up: out of attempts, permanent error, or retry budget spent
+                    wait = backoff_delay(attempt, delay, max_delay, jitter)
+                    print(f"Attempt {attempt + 1}/{retries} failed with error: {e}. Retrying in {wait:.2f} seconds...")
+                    time.sleep(wait) # Wait before the next retry
+                else:
+                    if budget is not None:
+                        budget.record_success()
+                    return result
         return wrapper
     return decorator_retry_on_failure
 
 
+def async_retry_on_failure(retries: int=3, delay: float=2, max_delay: float=30, jitter: bool=True,
+                           retryable=is_transient_error, budget: RetryBudget|None=retry_budget):
+    """
+    The asyncio counterpart of retry_on_failure for coroutine functions: waits
+    with asyncio.sleep so other tasks keep running during the backoff.
+    Takes the same arguments as retry_on_failure.
+    """
+    def decorator_async_retry_on_failure(func):
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            for attempt in range(retries):
+                try:
+                    result = await func(*args, **kwargs)
+                except sqlite3.Error as e:
+                    last_attempt = attempt + 1 >= retries
+                    if last_attempt or not retryable(e) or (budget is not None and not budget.try_spend()):
+                        raise
+                    wait = backoff_delay(attempt, delay, max_delay, jitter)
+                    print(f"Attempt {attempt + 1}/{retries} failed with error: {e}. Retrying in {wait:.2f} seconds...")
+                    await asyncio.sleep(wait)
+                else:
+                    if budget is not None:
+                        budget.record_success()
+                    return result
+        return wrapper
+    return decorator_async_retry_on_failure
+
+
 @with_db_connection
 @retry_on_failure(retries=3, delay=1)
 def fetch_users_with_retry(conn):
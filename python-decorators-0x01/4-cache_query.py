@@ -1,10 +1,13 @@
+import re
+import sys
+import pickle
+import hashlib
 import time
 import sqlite3 
 import functools
-
-
-# Empty cached query
-query_cache = {}
+import threading
+from collections import OrderedDict
+from query_invalidation import invalidate_tables, register_invalidation_hook, table_versions
 
 # Leverage the Task 1 connection management.
 def with_db_connection(func):
@@ -25,18 +28,412 @@ def with_db_connection(func):
     return wrapper
 
 
-# Global dictionary to store cached query results.
-query_cache = {}
+# Statements that change data; running one invalidates cached reads of its tables.
+WRITE_STATEMENT = re.compile(r'^\s*(INSERT|UPDATE|DELETE|REPLACE|CREATE|DROP|ALTER)\b', re.IGNORECASE)
+TABLE_REFERENCE = re.compile(r'\b(?:FROM|JOIN|INTO|UPDATE|TABLE)\s+[`"\[]?(\w+)', re.IGNORECASE)
+
+
+def referenced_tables(query: str) -> frozenset:
+    """
+    Return the lower-cased names of the tables a SQL statement reads or writes.
+    """
+    return frozenset(name.lower() for name in TABLE_REFERENCE.findall(query))
+
+
+def estimate_size(value) -> int:
+    """
+    Approximate the memory held by a cached result (lists/tuples of rows) in bytes.
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, (list, tuple)):
+        size += sum(estimate_size(item) for item in value)
+    elif isinstance(value, dict):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    return size
+
+
+class QueryCache:
+    """
+    A bounded, thread-safe LRU cache of query results.
+
+    Entries expire `ttl` seconds after they are stored, and the least recently
+    used entries are evicted once there are more than `max_entries` of them or
+    their estimated size exceeds `max_bytes`. Each entry remembers the tables
+    its query read so a write to one of them can drop it.
+    """
+
+    def __init__(self, max_entries: int=256, max_bytes: int=16 * 1024 * 1024, ttl: float|None=300.0):
+        """
+        Args:
+            max_entries (int): Maximum number of cached results (default: 256).
+            max_bytes (int): Maximum estimated size of all cached results (default: 16 MiB).
+            ttl (float | None): Seconds a result stays valid, None for no expiry (default: 300).
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (value, tables, size, expires_at)
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __contains__(self, key) -> bool:
+        return self.get(key, _count=False)[0]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _drop(self, key) -> None:
+        _, _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def get(self, key, _count: bool=True) -> tuple:
+        """
+        Look up a cached result.
+
+        Returns:
+            tuple: (True, value) on a hit, (False, None) on a miss or expired entry.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[3] is not None and entry[3] <= time.monotonic():
+                self._drop(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                if _count:
+                    self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            if _count:
+                self.hits += 1
+            return True, entry[0]
+
+    def set(self, key, value, tables: frozenset=frozenset()) -> None:
+        """
+        Store a result, evicting least recently used entries to stay within bounds.
+        Results larger than max_bytes on their own are not cached.
+        """
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        expires_at = None if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, tables, size, expires_at)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def discard(self, key) -> None:
+        """
+        Drop the result stored under `key`, if any.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+
+    def invalidate_tables(self, tables) -> int:
+        """
+        Drop every cached result that read one of `tables`. Returns how many were dropped.
+        """
+        tables = {name.lower() for name in tables}
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if entry[1] & tables]
+            for key in stale:
+                self._drop(key)
+            self.invalidations += len(stale)
+            return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """
+        Return the hit/miss/eviction counters and current size of the cache.
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+            }
+
+
+class DiskQueryCache:
+    """
+    A persistent second cache tier stored in a local SQLite file.
+
+    Results are pickled into the file so they survive restarts and are shared
+    by every process on the host that points at the same path. Entries expire
+    `ttl` seconds (wall clock) after they are written, and writes invalidate
+    by table just like QueryCache. Every `purge_every` writes, expired rows are
+    deleted and the oldest rows beyond `max_rows` are dropped, so the file
+    stays bounded. Only point this at a file you trust, since cached results
+    are unpickled on read.
+
+    The tier is best effort: a locked or broken cache file makes get() report a
+    miss and set() do nothing. If an invalidation fails the tier disables itself
+    for this process, since it could otherwise serve stale results.
+    """
+
+    def __init__(self, path: str='query_cache.db', ttl: float|None=3600.0, max_rows: int=10000,
+                 purge_every: int=100, timeout: float=1.0):
+        """
+        Args:
+            path (str): SQLite file holding the cached results (default: 'query_cache.db').
+            ttl (float | None): Seconds a result stays valid, None for no expiry (default: 3600).
+            max_rows (int): Maximum number of cached results kept in the file (default: 10000).
+            purge_every (int): Writes between purges of expired and excess rows (default: 100).
+            timeout (float): Seconds to wait for a locked cache file before treating it as a miss (default: 1).
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.purge_every = purge_every
+        self.timeout = timeout
+        self.disabled = False
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")  # readers in other processes don't block writers
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                expires_at REAL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_results_expires_at ON results (expires_at)")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS result_tables (
+                table_name TEXT NOT NULL,
+                key TEXT NOT NULL,
+                PRIMARY KEY (table_name, key)
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_result_tables_key ON result_tables (key)")
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread; sqlite3 connections can't be shared across threads by default
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=self.timeout)
+        return conn
+
+    @staticmethod
+    def _digest(key) -> str:
+        return hashlib.sha256(repr(key).encode()).hexdigest()
+
+    def get(self, key) -> tuple:
+        """
+        Returns:
+            tuple: (True, value) on a hit, (False, None) on a miss, an expired entry or a cache error.
+        """
+        if self.disabled:
+            return False, None
+        try:
+            row = self._conn().execute(
+                "SELECT value FROM results WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (self._digest(key), time.time()),
+            ).fetchone()
+            if row is None:
+                return False, None
+            return True, pickle.loads(row[0])
+        except (sqlite3.Error, pickle.UnpicklingError, EOFError) as e:
+            print(f"[CACHE] Disk cache read failed, treating as a miss: {e}")
+            return False, None
+
+    def set(self, key, value, tables: frozenset=frozenset()) -> None:
+        if self.disabled:
+            return
+        digest = self._digest(key)
+        expires_at = None if self.ttl is None else time.time() + self.ttl
+        try:
+            conn = self._conn()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO results (key, value, expires_at) VALUES (?, ?, ?)",
+                    (digest, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), expires_at),
+                )
+                conn.executemany(
+                    "INSERT OR IGNORE INTO result_tables (table_name, key) VALUES (?, ?)",
+                    [(name, digest) for name in tables],
+                )
+            with self._writes_lock:
+                self._writes += 1
+                due = self._writes % self.purge_every == 0
+            if due:
+                self.purge()
+        except (sqlite3.Error, pickle.PicklingError) as e:
+            print(f"[CACHE] Disk cache write failed, skipping: {e}")
+
+    def purge(self) -> None:
+        """
+        Delete expired rows, then the oldest rows beyond max_rows, and their table links.
+        """
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM results WHERE expires_at <= ?", (time.time(),))
+            # rowid grows with every INSERT OR REPLACE, so low rowids are the oldest entries
+            conn.execute("""
+                DELETE FROM results WHERE rowid IN (
+                    SELECT rowid FROM results ORDER BY rowid
+                    LIMIT max((SELECT COUNT(*) FROM results) - ?, 0)
+                )
+            """, (self.max_rows,))
+            conn.execute("DELETE FROM result_tables WHERE key NOT IN (SELECT key FROM results)")
+
+    def discard(self, key) -> None:
+        if self.disabled:
+            return
+        digest = self._digest(key)
+        try:
+            conn = self._conn()
+            with conn:
+                conn.execute("DELETE FROM results WHERE key = ?", (digest,))
+                conn.execute("DELETE FROM result_tables WHERE key = ?", (digest,))
+        except sqlite3.Error as e:
+            self.disabled = True
+            print(f"[CACHE] Disk cache invalidation failed, disabling the disk tier: {e}")
+
+    def invalidate_tables(self, tables) -> None:
+        names = [name.lower() for name in tables]
+        if not names or self.disabled:
+            return
+        placeholders = ', '.join('?' * len(names))
+        try:
+            conn = self._conn()
+            with conn:
+                conn.execute(
+                    f"DELETE FROM results WHERE key IN (SELECT key FROM result_tables WHERE table_name IN ({placeholders}))",
+                    names,
+                )
+                conn.execute(f"DELETE FROM result_tables WHERE table_name IN ({placeholders})", names)
+        except sqlite3.Error as e:
+            self.disabled = True
+            print(f"[CACHE] Disk cache invalidation failed, disabling the disk tier: {e}")
+
+    def clear(self) -> None:
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM results")
+            conn.execute("DELETE FROM result_tables")
+
+
+# Global cache of query results shared by every @cache_query function.
+query_cache = QueryCache()
+
+# Optional persistent tier behind query_cache; set to a DiskQueryCache to enable.
+disk_query_cache = None
+
+@register_invalidation_hook
+def invalidate_cached_tables(tables) -> None:
+    """
+    Drop cached results that read any of `tables` from both cache tiers. Registered with
+    query_invalidation, so writes committed through @transactional or
+    @group_transactional invalidate the cache too.
+    """
+    query_cache.invalidate_tables(tables)
+    if disk_query_cache is not None:
+        disk_query_cache.invalidate_tables(tables)
+
+
+def _cache_result(cache_key, result, tables: frozenset, versions: tuple, to_disk: bool) -> None:
+    # Store a result read while `tables` were at `versions`. If a write invalidated
+    # them since, the result may be stale: skip it, or drop it again when the write
+    # lands while we store it (its own invalidation may already have run).
+    if table_versions(tables) != versions:
+        return
+    query_cache.set(cache_key, result, tables)
+    if to_disk and disk_query_cache is not None:
+        disk_query_cache.set(cache_key, result, tables)
+    if table_versions(tables) != versions:
+        query_cache.discard(cache_key)
+        if to_disk and disk_query_cache is not None:
+            disk_query_cache.discard(cache_key)
+
+
+# SQL split into quoted literals, runs of whitespace and everything else.
+SQL_TOKEN = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|\s+|[^'\"\s]+|['\"]")
+
+
+def normalize_sql(query: str) -> str:
+    """
+    Collapse whitespace outside quoted literals and drop a trailing semicolon,
+    so formatting differences don't produce different cache keys.
+    """
+    tokens = [' ' if token.isspace() else token for token in SQL_TOKEN.findall(query)]
+    return ''.join(tokens).strip().rstrip(';').rstrip()
+
+
+def _freeze(params):
+    # Turn bound parameters into something hashable for use in a cache key
+    if params is None:
+        return ()
+    if isinstance(params, dict):
+        return tuple(sorted((key, _freeze(value)) for key, value in params.items()))
+    if isinstance(params, (list, tuple)):
+        return tuple(_freeze(value) for value in params)
+    return params
+
+
+def make_cache_key(query: str, params=None) -> tuple:
+    """
+    Build a cache key from the normalized SQL text and its bound parameters.
+    """
+    return normalize_sql(query), _freeze(params)
+
+
+class _Flight:
+    # One in-progress execution that concurrent callers with the same key wait on
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+# Cache keys currently being computed, guarded by _in_flight_lock.
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
 
 def cache_query(func):
     """
-    A decorator that caches the results of a function based on a query string.
-    It uses a global dictionary `query_cache` to store and retrieve results,
-    preventing redundant database calls for the same query.
+    A decorator that caches the results of a function based on a query string
+    and its parameters. It uses the global bounded `query_cache` (a QueryCache)
+    to store and retrieve results, preventing redundant database calls for the
+    same query.
+
+    Write statements (INSERT, UPDATE, DELETE, ...) are never cached; running one
+    through a cached function invalidates the cached results of the tables it touches,
+    as does a write committed through @transactional or @group_transactional.
+
+    The cache key is built by make_cache_key from:
+    1. The 'query' keyword argument, or the second positional argument (args[1]).
+    2. The 'params' keyword argument, or the third positional argument (args[2]).
+
+    When several threads miss on the same key at once, only the first runs the
+    query; the others wait for it and share its result (or its exception).
+    A result is not cached if one of its tables was invalidated while it was
+    being read, since it may predate the write.
 
-    The cache key is derived from:
-    1. The 'query' keyword argument.
-    2. The second positional argument (args[1]) if available.
+    If `disk_query_cache` is set, memory misses are looked up there before the
+    database is queried, and fresh results are written to both tiers.
 
     Args:
         func (callable): The function whose results are to be cached.
@@ -49,24 +446,72 @@ def cache_query(func):
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
         
-        # Determine the cache key from 'query' keyword arg or the second positional arg.
-        cache_key = kwargs.get('query') or (args[1] if len(args) > 1 else None)
+        # Determine the query from 'query' keyword arg or the second positional arg.
+        query = kwargs.get('query') or (args[1] if len(args) > 1 else None)
 
-        # If the cache key is not valid (e.g., no query found), execute without caching.
-        # Otherwise, check cache and store result if not found.
-        if cache_key is None:
+        # If the query is not valid (e.g., no query found), execute without caching.
+        if query is None:
             return func(*args, **kwargs) # Execute directly if no valid cache key
-        elif cache_key not in query_cache:
-            query_cache[cache_key] = func(*args, **kwargs) # Cache result if not present
-        return query_cache[cache_key] # Return cached result
+
+        # Writes go straight to the database and drop cached reads of the tables they touch.
+        if WRITE_STATEMENT.match(query):
+            result = func(*args, **kwargs)
+            invalidate_tables(referenced_tables(query))
+            return result
+
+        params = kwargs.get('params', args[2] if len(args) > 2 else None)
+        cache_key = make_cache_key(query, params)
+
+        hit, result = query_cache.get(cache_key)
+        if hit:
+            return result # Return cached result
+
+        with _in_flight_lock:
+            flight = _in_flight.get(cache_key)
+            leader = flight is None
+            if leader:
+                flight = _in_flight[cache_key] = _Flight()
+
+        if not leader:
+            # Another thread is already running this query; wait for its result.
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            # A previous leader may have filled the cache since our lookup.
+            hit, flight.result = query_cache.get(cache_key, _count=False)
+            if hit:
+                return flight.result
+            tables = referenced_tables(query)
+            versions = table_versions(tables) # Taken before reading, to catch writes that land meanwhile
+
+            # Fall back to the on-disk tier and promote its hits into memory.
+            if disk_query_cache is not None:
+                hit, flight.result = disk_query_cache.get(cache_key)
+                if hit:
+                    _cache_result(cache_key, flight.result, tables, versions, to_disk=False)
+                    return flight.result
+
+            flight.result = func(*args, **kwargs) # Cache result if not present
+            _cache_result(cache_key, flight.result, tables, versions, to_disk=True)
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with _in_flight_lock:
+                del _in_flight[cache_key]
+            flight.done.set()
     return wrapper
 
 
 @with_db_connection
 @cache_query
-def fetch_users_with_cache(conn, query):
+def fetch_users_with_cache(conn, query, params=None):
     cursor = conn.cursor()
-    cursor.execute(query)
+    cursor.execute(query, params or ())
     return cursor.fetchall()
 
 
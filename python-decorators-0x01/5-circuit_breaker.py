@@ -0,0 +1,196 @@
+import time
+import sqlite3
+import inspect
+import functools
+import threading
+from collections import deque
+
+retry_on_failure = __import__('3-retry_on_failure').retry_on_failure
+
+
+# Leverage the Task 1 connection management.
+def with_db_connection(func):
+    """
+    A decorator that automatically manages a SQLite database connection for the decorated function.
+
+    It establishes a connection to 'users.db', passes this connection object
+    as the first argument to the decorated function, and ensures the connection
+    is closed upon the function's completion, regardless of success or failure.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        conn = sqlite3.connect('users.db') # Establish connection
+        try:
+            return func(conn, *args, **kwargs) # Pass connection as first argument and execute
+        finally:
+            conn.close() # Ensure connection is closed
+    return wrapper
+
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(sqlite3.OperationalError):
+    """
+    Raised instead of calling the database while the circuit is open. It is a
+    sqlite3.OperationalError so existing `except sqlite3.Error` handlers still
+    apply, but is_transient_error does not classify it as retryable.
+    """
+
+
+class CircuitBreaker:
+    """
+    A circuit breaker for database calls, usable as a decorator on plain and
+    coroutine functions.
+
+    While closed, the outcome of the last `window_size` calls is tracked; once at
+    least `min_calls` have been seen and the failure rate reaches
+    `failure_rate_threshold`, the circuit opens and every call fails fast with
+    CircuitOpenError. After `cooldown` seconds it goes half-open and lets up to
+    `half_open_max_calls` trial calls through: a success closes the circuit, a
+    failure opens it again. Exceptions outside `counted_errors` (caller bugs,
+    cancellation, KeyboardInterrupt) say nothing about the database and never
+    move the state. Hooks registered with on_state_change are called with
+    (old_state, new_state, breaker) on every transition, outside the breaker's
+    lock, so they may call back into it.
+    """
+
+    def __init__(self, failure_rate_threshold: float=0.5, window_size: int=20, min_calls: int=5,
+                 cooldown: float=30.0, half_open_max_calls: int=1, counted_errors: tuple=(sqlite3.Error,)):
+        """
+        Args:
+            failure_rate_threshold (float): Failure fraction in the window that opens the circuit (default: 0.5).
+            window_size (int): Number of recent calls considered (default: 20).
+            min_calls (int): Calls needed in the window before the rate is evaluated (default: 5).
+            cooldown (float): Seconds to stay open before allowing trial calls (default: 30).
+            half_open_max_calls (int): Concurrent trial calls allowed while half-open (default: 1).
+            counted_errors (tuple): Exception types that count as failures (default: sqlite3.Error).
+        """
+        self.failure_rate_threshold = failure_rate_threshold
+        self.min_calls = min_calls
+        self.cooldown = cooldown
+        self.half_open_max_calls = half_open_max_calls
+        self.counted_errors = counted_errors
+
+        self.state = CLOSED
+        self._outcomes = deque(maxlen=window_size)  # True for failure
+        self._opened_at = 0.0
+        self._trial_calls = 0
+        self._hooks = []
+        self._lock = threading.Lock()
+
+    def on_state_change(self, hook):
+        """
+        Register hook(old_state, new_state, breaker); returns the hook so it can be used as a decorator.
+        """
+        self._hooks.append(hook)
+        return hook
+
+    def _transition(self, new_state: str) -> tuple:
+        # Called with the lock held; returns the (old, new) pair for _notify once it's released
+        old_state, self.state = self.state, new_state
+        if new_state == OPEN:
+            self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self._trial_calls = 0
+        return old_state, new_state
+
+    def _notify(self, transitions: list) -> None:
+        # Run hooks outside the lock so they may call back into the breaker
+        for old_state, new_state in transitions:
+            for hook in self._hooks:
+                hook(old_state, new_state, self)
+
+    def _before_call(self) -> None:
+        transitions = []
+        try:
+            with self._lock:
+                if self.state == OPEN:
+                    if time.monotonic() - self._opened_at < self.cooldown:
+                        raise CircuitOpenError("Circuit is open; database calls are failing fast")
+                    transitions.append(self._transition(HALF_OPEN))
+                if self.state == HALF_OPEN:
+                    if self._trial_calls >= self.half_open_max_calls:
+                        raise CircuitOpenError("Circuit is half-open; trial call already in progress")
+                    self._trial_calls += 1
+        finally:
+            self._notify(transitions)
+
+    def _after_call(self, failed: bool|None) -> None:
+        # failed is None for outcomes that say nothing about the database's health
+        transitions = []
+        with self._lock:
+            if self.state == HALF_OPEN:
+                if failed is None:
+                    self._trial_calls = max(self._trial_calls - 1, 0)  # free the trial slot, decide nothing
+                else:
+                    transitions.append(self._transition(OPEN if failed else CLOSED))
+            elif self.state == CLOSED and failed is not None:
+                self._outcomes.append(failed)
+                failures = sum(self._outcomes)
+                if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_rate_threshold:
+                    transitions.append(self._transition(OPEN))
+            # While OPEN: a call that started before the circuit opened; ignore it
+        self._notify(transitions)
+
+    def _record(self, error: BaseException|None) -> None:
+        if error is None:
+            self._after_call(False)
+        elif isinstance(error, self.counted_errors) and not isinstance(error, CircuitOpenError):
+            self._after_call(True)
+        else:
+            # Not a database failure (caller bug, cancellation, KeyboardInterrupt):
+            # don't count it either way.
+            self._after_call(None)
+
+    def __call__(self, func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                self._before_call()
+                try:
+                    result = await func(*args, **kwargs)
+                except BaseException as e:
+                    self._record(e)
+                    raise
+                self._record(None)
+                return result
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            self._before_call()
+            try:
+                result = func(*args, **kwargs)
+            except BaseException as e:
+                self._record(e)
+                raise
+            self._record(None)
+            return result
+        return wrapper
+
+
+# Breaker shared by the functions talking to users.db
+users_db_breaker = CircuitBreaker()
+
+
+@users_db_breaker.on_state_change
+def log_state_change(old_state, new_state, breaker):
+    print(f"[CIRCUIT] {old_state} -> {new_state}")
+
+
+# The breaker goes outermost so an open circuit skips both the connection and the retries.
+@users_db_breaker
+@with_db_connection
+@retry_on_failure(retries=3, delay=1)
+def fetch_users_with_breaker(conn):
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM users")
+    return cursor.fetchall()
+
+
+if __name__ == "__main__":
+    users = fetch_users_with_breaker()
+    print(users)
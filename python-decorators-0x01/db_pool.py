@@ -0,0 +1,296 @@
+import os
+import random
+import sqlite3
+import functools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+# PRAGMA settings applied to every new connection, in order.
+# Readers don't block the writer under WAL, and NORMAL sync is safe with WAL.
+WAL_PROFILE = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -64000,       # negative means KiB, so ~64 MiB of page cache
+    'mmap_size': 268435456,     # 256 MiB memory-mapped I/O
+    'busy_timeout': 5000,       # ms to wait on a lock before "database is locked"
+    'temp_store': 'MEMORY',
+}
+
+# SQLite's own defaults: rollback journal, synchronous=FULL.
+DEFAULT_PROFILE = {}
+
+_PRAGMAS = {'journal_mode', 'synchronous', 'cache_size', 'mmap_size', 'busy_timeout', 'temp_store', 'foreign_keys'}
+
+
+def apply_profile(conn: sqlite3.Connection, profile: dict|None) -> sqlite3.Connection:
+    """
+    Run each `PRAGMA name = value` of `profile` on `conn` and return the connection.
+
+    Raises:
+        ValueError: If the profile names a pragma outside the supported set.
+    """
+    for name, value in (profile or {}).items():
+        if name not in _PRAGMAS:
+            raise ValueError(f"Unsupported pragma in connection profile: {name}")
+        conn.execute(f"PRAGMA {name} = {value}")
+    return conn
+
+
+def connect(database: str='users.db', profile: dict|None=None, **kwargs) -> sqlite3.Connection:
+    """
+    Open a SQLite connection and apply a connection profile to it (none by default).
+
+    Note that journal_mode=WAL, as set by WAL_PROFILE, is stored in the database
+    file: once applied, every later connection to that file uses WAL too.
+    """
+    return apply_profile(sqlite3.connect(database, **kwargs), profile)
+
+
+class ConnectionPool:
+    """
+    A thread-safe pool of SQLite connections to a single database file.
+
+    No connection is opened until the first checkout, which also opens the
+    `min_size` warm connections. Connections are created up to `max_size`, kept warm between calls and
+    handed out most-recently-used first. A thread that already holds a connection
+    gets the same one back on nested checkouts, so decorated functions calling
+    each other share one connection. Idle connections are health-checked before
+    reuse and closed once they have been idle longer than `idle_timeout`, while
+    at least `min_size` are kept open.
+    """
+
+    def __init__(self, database: str='users.db', min_size: int=1, max_size: int=5,
+                 idle_timeout: float=300.0, acquire_timeout: float|None=10.0, health_check: bool=True,
+                 profile: dict|None=None):
+        """
+        Args:
+            database (str): Path of the SQLite database file (default: 'users.db').
+            min_size (int): Connections opened on first use and never evicted (default: 1).
+            max_size (int): Upper bound on open connections (default: 5).
+            idle_timeout (float): Seconds an idle connection is kept above min_size (default: 300).
+            acquire_timeout (float | None): Seconds to wait for a free connection, None waits forever (default: 10).
+            health_check (bool): Run 'SELECT 1' on idle connections before handing them out (default: True).
+            profile (dict | None): Pragmas applied to each new connection, e.g. WAL_PROFILE (default: None).
+        """
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Need 0 <= min_size <= max_size and max_size >= 1")
+
+        self.database = database
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+        self.health_check = health_check
+        self.profile = profile
+
+        self._idle = deque()  # (connection, released_at), most recent on the right
+        self._size = 0
+        self._lock = threading.Condition()
+        self._local = threading.local()
+        self._warmed = False
+
+    def _connect(self) -> sqlite3.Connection:
+        # Connections may be released by one thread and checked out by another
+        return connect(self.database, self.profile, check_same_thread=False)
+
+    def _is_healthy(self, conn: sqlite3.Connection) -> bool:
+        try:
+            conn.execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _evict_idle(self) -> None:
+        # Called with the lock held: close the oldest idle connections past idle_timeout
+        now = time.monotonic()
+        while self._idle and self._size > self.min_size and now - self._idle[0][1] > self.idle_timeout:
+            conn, _ = self._idle.popleft()
+            conn.close()
+            self._size -= 1
+
+    def acquire(self) -> sqlite3.Connection:
+        """
+        Check a connection out of the pool, reusing the one this thread already holds.
+
+        Raises:
+            sqlite3.OperationalError: If no connection frees up within acquire_timeout.
+        """
+        held = getattr(self._local, 'conn', None)
+        if held is not None:
+            self._local.depth += 1
+            return held
+
+        deadline = None if self.acquire_timeout is None else time.monotonic() + self.acquire_timeout
+        with self._lock:
+            if not self._warmed:
+                self._warmed = True
+                for _ in range(self.min_size - self._size):
+                    self._idle.append((self._connect(), time.monotonic()))
+                    self._size += 1
+            while True:
+                self._evict_idle()
+                if self._idle:
+                    conn, _ = self._idle.pop()
+                    if self.health_check and not self._is_healthy(conn):
+                        conn.close()
+                        self._size -= 1
+                        continue
+                    break
+                if self._size < self.max_size:
+                    conn = self._connect()
+                    self._size += 1
+                    break
+
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise sqlite3.OperationalError(f"Timed out waiting for a connection to {self.database}")
+                self._lock.wait(remaining)
+
+        self._local.conn = conn
+        self._local.depth = 1
+        return conn
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        """
+        Return a connection checked out by this thread. Uncommitted work is rolled back.
+        """
+        if getattr(self._local, 'conn', None) is not conn:
+            raise RuntimeError("Connection was not checked out by this thread")
+        self._local.depth -= 1
+        if self._local.depth > 0:
+            return
+        self._local.conn = None
+
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            conn.close()
+            with self._lock:
+                self._size -= 1
+                self._lock.notify()
+            return
+
+        with self._lock:
+            self._idle.append((conn, time.monotonic()))
+            self._evict_idle()
+            self._lock.notify()
+
+    @contextmanager
+    def connection(self):
+        """
+        Context manager that checks a connection out and returns it on exit.
+        """
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self) -> None:
+        """
+        Close every idle connection. Connections still checked out are closed when released.
+        """
+        with self._lock:
+            while self._idle:
+                conn, _ = self._idle.pop()
+                conn.close()
+                self._size -= 1
+            self.min_size = 0
+            self.idle_timeout = -1
+
+
+def with_pooled_connection(pool: ConnectionPool):
+    """
+    A decorator factory like with_db_connection, but the connection passed as the
+    first argument is checked out of `pool` and returned to it afterwards instead
+    of being opened and closed on every call.
+
+    Args:
+        pool (ConnectionPool): The pool to borrow connections from.
+
+    Returns:
+        callable: A decorator that can be applied to a function.
+    """
+    def decorator_with_pooled_connection(func):
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with pool.connection() as conn:
+                return func(conn, *args, **kwargs)
+        return wrapper
+    return decorator_with_pooled_connection
+
+
+def benchmark_profiles(database: str='profile_bench.db', rows: int=10000, readers: int=4,
+                       writers: int=1, duration: float=2.0) -> dict:
+    """
+    Measure read and write throughput under concurrent load for DEFAULT_PROFILE
+    and WAL_PROFILE. For each profile a fresh scratch database is seeded, then
+    `readers` threads run point SELECTs and `writers` threads run committed
+    UPDATEs for `duration` seconds. The scratch files are removed afterwards.
+
+    Returns:
+        dict: profile name -> {'reads_per_sec': ..., 'writes_per_sec': ...}
+    """
+    results = {}
+    for name, profile in (('default', DEFAULT_PROFILE), ('wal', WAL_PROFILE)):
+        for suffix in ('', '-wal', '-shm', '-journal'):
+            if os.path.exists(database + suffix):
+                os.remove(database + suffix)
+
+        setup = connect(database, profile)
+        setup.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT, email TEXT)")
+        setup.executemany("INSERT INTO users (id, name, email) VALUES (?, ?, ?)",
+                          ((i, f"user{i}", f"user{i}@example.com") for i in range(rows)))
+        setup.commit()
+        setup.close()
+
+        counts = {'reads': 0, 'writes': 0}
+        counts_lock = threading.Lock()
+        stop = threading.Event()
+
+        def worker(kind):
+            # Each thread has its own connection; busy_timeout keeps lock waits inside SQLite
+            conn = connect(database, profile or {'busy_timeout': 5000}, timeout=5)
+            done = 0
+            try:
+                while not stop.is_set():
+                    user_id = random.randrange(rows)
+                    if kind == 'reads':
+                        conn.execute("SELECT * FROM users WHERE id = ?", (user_id,)).fetchone()
+                    else:
+                        conn.execute("UPDATE users SET email = ? WHERE id = ?", (f"{done}@example.com", user_id))
+                        conn.commit()
+                    done += 1
+            finally:
+                conn.close()
+                with counts_lock:
+                    counts[kind] += done
+
+        threads = [threading.Thread(target=worker, args=('reads',)) for _ in range(readers)]
+        threads += [threading.Thread(target=worker, args=('writes',)) for _ in range(writers)]
+        for thread in threads:
+            thread.start()
+        time.sleep(duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        results[name] = {
+            'reads_per_sec': round(counts['reads'] / duration),
+            'writes_per_sec': round(counts['writes'] / duration),
+        }
+        print(f"{name:>7}: {results[name]['reads_per_sec']} reads/s, {results[name]['writes_per_sec']} writes/s")
+
+    for suffix in ('', '-wal', '-shm', '-journal'):
+        if os.path.exists(database + suffix):
+            os.remove(database + suffix)
+    return results
+
+
+if __name__ == "__main__":
+    benchmark_profiles()
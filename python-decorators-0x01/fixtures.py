@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+""" Shared test fixtures: a throwaway users.db for the decorator tests """
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+
+USERS = [(1, 'alice', 'alice@example.com'), (2, 'bob', 'bob@example.com')]
+
+
+class TempDatabaseTestCase(unittest.TestCase):
+    """ Base TESTCASE that runs each test in a fresh directory with a seeded users.db """
+
+    def setUp(self):
+        """ create users.db in a temporary directory and work from there """
+        self.previous_dir = os.getcwd()
+        self.temp_dir = tempfile.mkdtemp()
+        os.chdir(self.temp_dir)
+        self.database = os.path.join(self.temp_dir, 'users.db')
+        conn = sqlite3.connect(self.database)
+        conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT, email TEXT)")
+        conn.executemany("INSERT INTO users (id, name, email) VALUES (?, ?, ?)", USERS)
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        """ go back to where we started and remove the temporary directory """
+        os.chdir(self.previous_dir)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def count_users(self):
+        """ number of rows currently committed to users """
+        conn = sqlite3.connect(self.database)
+        try:
+            return conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+        finally:
+            conn.close()
@@ -0,0 +1,79 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+# Callables taking a set of table names; cache_query registers its caches here.
+_invalidation_hooks = []
+
+# Number of invalidations seen per table, so a reader can tell a write landed while it ran.
+_table_versions = {}
+_versions_lock = threading.Lock()
+
+# Authorizer actions that change a table, with the position of the table name in their arguments.
+_WRITE_ACTIONS = {
+    sqlite3.SQLITE_INSERT: 0,
+    sqlite3.SQLITE_UPDATE: 0,
+    sqlite3.SQLITE_DELETE: 0,
+    sqlite3.SQLITE_DROP_TABLE: 0,
+    sqlite3.SQLITE_ALTER_TABLE: 1,
+}
+
+
+def register_invalidation_hook(hook):
+    """
+    Register hook(tables) to be called whenever a committed write touched `tables`.
+    Returns the hook so this can be used as a decorator.
+    """
+    _invalidation_hooks.append(hook)
+    return hook
+
+
+def table_versions(tables) -> tuple:
+    """
+    Return the invalidation counters of `tables`. Two snapshots differ if any of
+    the tables was invalidated in between.
+    """
+    with _versions_lock:
+        return tuple(_table_versions.get(name, 0) for name in sorted({name.lower() for name in tables}))
+
+
+def invalidate_tables(tables) -> None:
+    """
+    Tell every registered cache that `tables` have changed. The tables' counters
+    are bumped before the hooks run.
+    """
+    tables = {name.lower() for name in tables}
+    if not tables:
+        return
+    with _versions_lock:
+        for name in tables:
+            _table_versions[name] = _table_versions.get(name, 0) + 1
+    for hook in _invalidation_hooks:
+        hook(tables)
+
+
+@contextmanager
+def track_written_tables(conn: sqlite3.Connection):
+    """
+    Record the tables written through `conn` while the block runs.
+
+    Installs a SQLite authorizer that notes the target table of every INSERT,
+    UPDATE, DELETE, DROP TABLE and ALTER TABLE statement, and yields the set it
+    fills. The authorizer is removed on exit.
+    """
+    written = set()
+
+    def authorizer(action, arg1, arg2, db_name, source):
+        position = _WRITE_ACTIONS.get(action)
+        if position is not None:
+            table = (arg1, arg2)[position]
+            if table and not table.startswith('sqlite_'):
+                written.add(table.lower())
+        return sqlite3.SQLITE_OK
+
+    conn.set_authorizer(authorizer)
+    try:
+        yield written
+    finally:
+        conn.set_authorizer(None)
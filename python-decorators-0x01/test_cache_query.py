@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+""" Unit tests for QueryCache and the cache_query decorator """
+import os
+import sqlite3
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from fixtures import TempDatabaseTestCase
+
+cache_module = __import__('4-cache_query')
+transactional_module = __import__('2-transactional')
+QueryCache = cache_module.QueryCache
+DiskQueryCache = cache_module.DiskQueryCache
+
+
+class TestQueryCache(unittest.TestCase):
+    """ TESTCASE """
+
+    def test_least_recently_used_evicted(self):
+        """ going over max_entries drops the least recently used entry """
+        cache = QueryCache(max_entries=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertIn('c', cache)
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_entries_expire_after_ttl(self):
+        """ an entry older than ttl is a miss """
+        cache = QueryCache(ttl=10)
+        with patch.object(cache_module.time, 'monotonic', return_value=100.0):
+            cache.set('a', 1)
+        with patch.object(cache_module.time, 'monotonic', return_value=109.0):
+            self.assertEqual(cache.get('a'), (True, 1))
+        with patch.object(cache_module.time, 'monotonic', return_value=110.0):
+            self.assertEqual(cache.get('a'), (False, None))
+        self.assertEqual(cache.stats()['expirations'], 1)
+
+    def test_max_bytes_bounds_total_size(self):
+        """ entries are evicted to keep the estimated size under max_bytes """
+        row = [('x' * 100,)]
+        size = cache_module.estimate_size(row)
+        cache = QueryCache(max_bytes=size * 2)
+        for key in 'abc':
+            cache.set(key, row)
+        self.assertEqual(len(cache), 2)
+        self.assertNotIn('a', cache)
+        self.assertLessEqual(cache.stats()['bytes'], size * 2)
+
+    def test_oversized_result_not_cached(self):
+        """ a result bigger than max_bytes on its own is skipped """
+        cache = QueryCache(max_bytes=10)
+        cache.set('a', [('x' * 100,)])
+        self.assertNotIn('a', cache)
+
+    def test_invalidate_tables(self):
+        """ only entries that read an invalidated table are dropped """
+        cache = QueryCache()
+        cache.set('users', 1, frozenset({'users'}))
+        cache.set('orders', 2, frozenset({'orders'}))
+        self.assertEqual(cache.invalidate_tables({'USERS'}), 1)
+        self.assertNotIn('users', cache)
+        self.assertIn('orders', cache)
+
+
+class TestCacheQueryInvalidation(TempDatabaseTestCase):
+    """ TESTCASE """
+
+    def setUp(self):
+        """ start every test from an empty memory cache """
+        super().setUp()
+        cache_module.query_cache.clear()
+
+    def tearDown(self):
+        """ leave no cached results behind for other tests """
+        cache_module.query_cache.clear()
+        super().tearDown()
+
+    def test_write_invalidates_cached_reads(self):
+        """ a write through a cached function drops reads of the same table """
+        calls = []
+
+        @cache_module.cache_query
+        def run(conn, query, params=None):
+            calls.append(query)
+            return [('row',)]
+
+        run(None, "SELECT * FROM users")
+        run(None, "SELECT * FROM users")
+        run(None, "UPDATE users SET name = 'x'")
+        run(None, "SELECT * FROM users")
+        self.assertEqual(calls.count("SELECT * FROM users"), 2)
+
+    def test_transactional_write_invalidates_cached_reads(self):
+        """ a write committed through @transactional drops cached reads """
+        query = "SELECT email FROM users WHERE id = ?"
+        cache_module.fetch_users_with_cache(query=query, params=(1,))
+        transactional_module.update_user_email(user_id=1, new_email='new@example.com')
+        self.assertEqual(cache_module.fetch_users_with_cache(query=query, params=(1,)), [('new@example.com',)])
+
+    def test_write_during_read_not_cached(self):
+        """ a result read before a concurrent write commits is not cached """
+        query = "SELECT email FROM users WHERE id = ?"
+
+        @cache_module.with_db_connection
+        @cache_module.cache_query
+        def fetch(conn, query, params=None):
+            rows = conn.execute(query, params).fetchall()
+            # Another thread commits a change after we read but before we cache
+            writer = threading.Thread(target=transactional_module.update_user_email,
+                                      kwargs={'user_id': 1, 'new_email': 'new@example.com'})
+            writer.start()
+            writer.join()
+            return rows
+
+        self.assertEqual(fetch(query=query, params=(1,)), [('alice@example.com',)])
+        self.assertEqual(cache_module.fetch_users_with_cache(query=query, params=(1,)), [('new@example.com',)])
+
+
+class TestCacheQuerySingleFlight(TempDatabaseTestCase):
+    """ TESTCASE """
+
+    def setUp(self):
+        """ start every test from an empty memory cache """
+        super().setUp()
+        cache_module.query_cache.clear()
+
+    def tearDown(self):
+        """ leave no cached results behind for other tests """
+        cache_module.query_cache.clear()
+        super().tearDown()
+
+    def test_cache_key_ignores_formatting(self):
+        """ whitespace and a trailing semicolon outside literals don't change the key """
+        self.assertEqual(cache_module.make_cache_key("SELECT  *\nFROM users;", [1]),
+                         cache_module.make_cache_key("SELECT * FROM users", (1,)))
+        self.assertNotEqual(cache_module.make_cache_key("SELECT * FROM users WHERE name = 'a  b'"),
+                            cache_module.make_cache_key("SELECT * FROM users WHERE name = 'a b'"))
+        self.assertNotEqual(cache_module.make_cache_key("SELECT * FROM users WHERE id = ?", (1,)),
+                            cache_module.make_cache_key("SELECT * FROM users WHERE id = ?", (2,)))
+
+    def test_concurrent_misses_run_query_once(self):
+        """ threads missing on the same key share one execution """
+        calls = []
+        gate = threading.Event()
+
+        @cache_module.cache_query
+        def fetch(conn, query, params=None):
+            calls.append(query)
+            gate.wait(5)
+            return [('row',)]
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(fetch(None, "SELECT * FROM users")))
+                   for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        gate.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [[('row',)]] * 10)
+
+    def test_leader_error_shared_and_not_cached(self):
+        """ waiters get the leader's exception and the next call retries """
+        calls = []
+        gate = threading.Event()
+
+        @cache_module.cache_query
+        def fetch(conn, query, params=None):
+            calls.append(query)
+            gate.wait(5)
+            if len(calls) == 1:
+                raise sqlite3.OperationalError("boom")
+            return [('row',)]
+
+        errors = []
+
+        def run():
+            try:
+                fetch(None, "SELECT * FROM users")
+            except sqlite3.OperationalError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=run) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        gate.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(errors), 5)
+        self.assertEqual(fetch(None, "SELECT * FROM users"), [('row',)])
+        self.assertEqual(len(calls), 2)
+
+
+class TestDiskQueryCache(TempDatabaseTestCase):
+    """ TESTCASE """
+
+    def setUp(self):
+        """ a disk cache file in the temporary directory """
+        super().setUp()
+        self.path = os.path.join(self.temp_dir, 'query_cache.db')
+
+    def count_rows(self, cache, table):
+        """ rows currently stored in one of the cache file's tables """
+        return cache._conn().execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def test_results_persist_across_instances(self):
+        """ a result stored by one instance is read back by another """
+        DiskQueryCache(self.path).set('key', [(1, 'alice')], frozenset({'users'}))
+        self.assertEqual(DiskQueryCache(self.path).get('key'), (True, [(1, 'alice')]))
+        self.assertEqual(DiskQueryCache(self.path).get('other'), (False, None))
+
+    def test_expired_result_is_a_miss(self):
+        """ a result past its ttl is not returned """
+        cache = DiskQueryCache(self.path, ttl=-1)
+        cache.set('key', [1])
+        self.assertEqual(cache.get('key'), (False, None))
+
+    def test_purge_drops_expired_and_excess_rows(self):
+        """ purging removes expired rows, the oldest rows over max_rows and their table links """
+        expired = DiskQueryCache(self.path, ttl=-1)
+        expired.set('old', [0], frozenset({'users'}))
+        cache = DiskQueryCache(self.path, ttl=None, max_rows=3, purge_every=5)
+        for i in range(5):
+            cache.set(('key', i), [i], frozenset({'users'}))
+        self.assertEqual(self.count_rows(cache, 'results'), 3)
+        self.assertEqual(self.count_rows(cache, 'result_tables'), 3)
+        self.assertEqual(cache.get(('key', 0)), (False, None))
+        self.assertEqual(cache.get(('key', 4)), (True, [4]))
+
+    def test_invalidate_tables(self):
+        """ only results that read an invalidated table are dropped """
+        cache = DiskQueryCache(self.path)
+        cache.set('users', [1], frozenset({'users'}))
+        cache.set('orders', [2], frozenset({'orders'}))
+        cache.invalidate_tables({'USERS'})
+        self.assertEqual(cache.get('users'), (False, None))
+        self.assertEqual(cache.get('orders'), (True, [2]))
+        self.assertEqual(self.count_rows(cache, 'result_tables'), 1)
+
+    def test_errors_are_misses(self):
+        """ a broken cache file makes get() miss and set() do nothing """
+        cache = DiskQueryCache(self.path)
+        cache._conn().execute("DROP TABLE results")
+        self.assertEqual(cache.get('key'), (False, None))
+        cache.set('key', [1])
+        self.assertFalse(cache.disabled)
+
+    def test_failed_invalidation_disables_tier(self):
+        """ after an invalidation fails the tier serves nothing """
+        cache = DiskQueryCache(self.path)
+        cache.set('key', [1], frozenset({'users'}))
+        cache._conn().execute("DROP TABLE result_tables")
+        cache.invalidate_tables({'users'})
+        self.assertTrue(cache.disabled)
+        self.assertEqual(cache.get('key'), (False, None))
+
+    def test_cache_query_promotes_disk_hits(self):
+        """ cache_query serves memory misses from the disk tier """
+        calls = []
+
+        @cache_module.cache_query
+        def fetch(conn, query, params=None):
+            calls.append(query)
+            return [('row',)]
+
+        cache_module.query_cache.clear()
+        with patch.object(cache_module, 'disk_query_cache', DiskQueryCache(self.path)):
+            try:
+                fetch(None, "SELECT * FROM users")
+                cache_module.query_cache.clear()
+                self.assertEqual(fetch(None, "SELECT * FROM users"), [('row',)])
+                self.assertEqual(len(calls), 1)
+                self.assertIn(cache_module.make_cache_key("SELECT * FROM users"), cache_module.query_cache)
+            finally:
+                cache_module.query_cache.clear()
+
+
+if __name__ == '__main__':
+    unittest.main()
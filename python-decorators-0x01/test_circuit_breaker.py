@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+""" Unit tests for the CircuitBreaker decorator """
+import sqlite3
+import unittest
+
+breaker_module = __import__('5-circuit_breaker')
+CircuitBreaker = breaker_module.CircuitBreaker
+CircuitOpenError = breaker_module.CircuitOpenError
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """ TESTCASE """
+
+    @staticmethod
+    def make_call(breaker):
+        """ a breaker-wrapped function raising whatever it is given """
+        @breaker
+        def call(error=None):
+            if error is not None:
+                raise error
+            return 'ok'
+        return call
+
+    def test_opens_after_failure_rate_and_fails_fast(self):
+        """ reaching the failure rate opens the circuit """
+        breaker = CircuitBreaker(failure_rate_threshold=0.5, window_size=4, min_calls=4, cooldown=60)
+        call = self.make_call(breaker)
+        call()
+        call()
+        for _ in range(2):
+            with self.assertRaises(sqlite3.OperationalError):
+                call(sqlite3.OperationalError("database is locked"))
+        self.assertEqual(breaker.state, breaker_module.OPEN)
+        with self.assertRaises(CircuitOpenError):
+            call()
+
+    def test_non_database_errors_not_counted(self):
+        """ caller bugs and interrupts never open the circuit """
+        breaker = CircuitBreaker(window_size=4, min_calls=2, cooldown=60)
+        call = self.make_call(breaker)
+        for error in (ValueError("bug"), KeyboardInterrupt(), ValueError("bug")):
+            with self.assertRaises(type(error)):
+                call(error)
+        self.assertEqual(breaker.state, breaker_module.CLOSED)
+        self.assertEqual(len(breaker._outcomes), 0)
+
+    def test_half_open_success_closes(self):
+        """ a successful trial call closes the circuit """
+        breaker = CircuitBreaker(window_size=2, min_calls=1, cooldown=0)
+        call = self.make_call(breaker)
+        with self.assertRaises(sqlite3.OperationalError):
+            call(sqlite3.OperationalError("disk I/O error"))
+        self.assertEqual(breaker.state, breaker_module.OPEN)
+        self.assertEqual(call(), 'ok')
+        self.assertEqual(breaker.state, breaker_module.CLOSED)
+
+    def test_half_open_failure_reopens(self):
+        """ a failed trial call opens the circuit again """
+        breaker = CircuitBreaker(window_size=2, min_calls=1, cooldown=0)
+        call = self.make_call(breaker)
+        for _ in range(2):
+            with self.assertRaises(sqlite3.OperationalError):
+                call(sqlite3.OperationalError("disk I/O error"))
+        self.assertEqual(breaker.state, breaker_module.OPEN)
+
+    def test_half_open_trial_slot_freed_by_non_database_error(self):
+        """ a trial call failing for an unrelated reason doesn't wedge the breaker """
+        breaker = CircuitBreaker(window_size=2, min_calls=1, cooldown=0)
+        call = self.make_call(breaker)
+        with self.assertRaises(sqlite3.OperationalError):
+            call(sqlite3.OperationalError("disk I/O error"))
+        with self.assertRaises(ValueError):
+            call(ValueError("bug"))
+        self.assertEqual(breaker.state, breaker_module.HALF_OPEN)
+        self.assertEqual(call(), 'ok')
+        self.assertEqual(breaker.state, breaker_module.CLOSED)
+
+    def test_hooks_run_outside_the_lock(self):
+        """ state-change hooks see every transition and may use the breaker """
+        breaker = CircuitBreaker(window_size=2, min_calls=1, cooldown=0)
+        call = self.make_call(breaker)
+        seen = []
+
+        @breaker.on_state_change
+        def hook(old_state, new_state, b):
+            acquired = b._lock.acquire(timeout=1)
+            if acquired:
+                b._lock.release()
+            seen.append((old_state, new_state, acquired))
+
+        with self.assertRaises(sqlite3.OperationalError):
+            call(sqlite3.OperationalError("disk I/O error"))
+        call()
+        self.assertEqual(seen, [
+            (breaker_module.CLOSED, breaker_module.OPEN, True),
+            (breaker_module.OPEN, breaker_module.HALF_OPEN, True),
+            (breaker_module.HALF_OPEN, breaker_module.CLOSED, True),
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
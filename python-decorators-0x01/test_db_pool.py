@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+""" Unit tests for the SQLite connection pool in db_pool """
+import os
+import sqlite3
+import threading
+import time
+import unittest
+from db_pool import ConnectionPool, WAL_PROFILE, apply_profile, connect
+from fixtures import TempDatabaseTestCase
+
+
+class TestConnectionPool(TempDatabaseTestCase):
+    """ TESTCASE """
+
+    def test_nothing_opened_before_first_checkout(self):
+        """ constructing a pool opens no connection and creates no file """
+        path = os.path.join(self.temp_dir, 'lazy.db')
+        pool = ConnectionPool(path, min_size=2)
+        self.assertFalse(os.path.exists(path))
+        with pool.connection():
+            pass
+        self.assertEqual(pool._size, 2)
+        pool.close()
+
+    def test_nested_checkout_reuses_connection(self):
+        """ a thread checking out twice gets the same connection back """
+        pool = ConnectionPool(self.database, min_size=1, max_size=1)
+        with pool.connection() as outer:
+            with pool.connection() as inner:
+                self.assertIs(inner, outer)
+            # still held by the outer checkout
+            self.assertIs(pool._local.conn, outer)
+        self.assertIsNone(pool._local.conn)
+        pool.close()
+
+    def test_connection_reused_across_checkouts(self):
+        """ a released connection is handed out again instead of reopened """
+        pool = ConnectionPool(self.database, min_size=1, max_size=2)
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            self.assertIs(second, first)
+        pool.close()
+
+    def test_acquire_timeout(self):
+        """ acquire raises once max_size connections are held elsewhere """
+        pool = ConnectionPool(self.database, min_size=0, max_size=1, acquire_timeout=0.1)
+        held = threading.Event()
+        done = threading.Event()
+
+        def hold():
+            with pool.connection():
+                held.set()
+                done.wait(5)
+
+        holder = threading.Thread(target=hold)
+        holder.start()
+        held.wait(5)
+        try:
+            with self.assertRaises(sqlite3.OperationalError):
+                pool.acquire()
+        finally:
+            done.set()
+            holder.join()
+        with pool.connection() as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM users").fetchone()[0], 2)
+        pool.close()
+
+    def test_idle_connections_evicted_above_min_size(self):
+        """ connections idle past idle_timeout are closed, min_size are kept """
+        pool = ConnectionPool(self.database, min_size=1, max_size=3, idle_timeout=0.05)
+        started = threading.Barrier(4)  # three borrowers plus this thread
+        release = threading.Event()
+
+        def borrow():
+            with pool.connection():
+                started.wait(5)
+                release.wait(5)
+
+        threads = [threading.Thread(target=borrow) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        started.wait(5)
+        self.assertEqual(pool._size, 3)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        time.sleep(0.1)
+        with pool.connection():
+            pass
+        self.assertEqual(pool._size, 1)
+        pool.close()
+
+    def test_uncommitted_work_rolled_back_on_release(self):
+        """ a connection goes back to the pool without a pending transaction """
+        pool = ConnectionPool(self.database, min_size=1, max_size=1)
+        with pool.connection() as conn:
+            conn.execute("DELETE FROM users")
+        self.assertEqual(self.count_users(), 2)
+        pool.close()
+
+
+class TestConnectionProfiles(TempDatabaseTestCase):
+    """ TESTCASE """
+
+    def test_unknown_pragma_rejected(self):
+        """ a profile naming an unsupported pragma raises before running it """
+        conn = sqlite3.connect(self.database)
+        try:
+            with self.assertRaises(ValueError):
+                apply_profile(conn, {'writable_schema': 1})
+        finally:
+            conn.close()
+
+    def test_default_leaves_journal_mode(self):
+        """ connect() without a profile keeps SQLite's rollback journal """
+        conn = connect(self.database)
+        try:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], 'delete')
+        finally:
+            conn.close()
+
+    def test_wal_profile_applied(self):
+        """ the WAL profile's pragmas are set on the connection """
+        conn = connect(self.database, WAL_PROFILE)
+        try:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], 'wal')
+            self.assertEqual(conn.execute("PRAGMA busy_timeout").fetchone()[0], WAL_PROFILE['busy_timeout'])
+        finally:
+            conn.close()
+
+    def test_pool_applies_profile(self):
+        """ pooled connections are opened with the pool's profile """
+        pool = ConnectionPool(self.database, profile={'busy_timeout': 1234})
+        with pool.connection() as conn:
+            self.assertEqual(conn.execute("PRAGMA busy_timeout").fetchone()[0], 1234)
+        pool.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+""" Unit tests for structured query logging and the query statistics registry """
+import logging
+import unittest
+
+log_module = __import__('0-log_queries')
+fingerprint = log_module.fingerprint
+QueryStatsRegistry = log_module.QueryStatsRegistry
+log_queries_structured = log_module.log_queries_structured
+
+
+class ListHandler(logging.Handler):
+    """ keeps every record it handles """
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class TestFingerprint(unittest.TestCase):
+    """ TESTCASE """
+
+    def test_same_shape_same_fingerprint(self):
+        """ statements differing only in values, sign or spacing share a fingerprint """
+        variants = [
+            "select * from t where c=-4.5 and name='bob'",
+            "SELECT *  FROM t WHERE c = 9 AND name = 'it''s'",
+            "SELECT * FROM t\nWHERE c= +0x1F AND name ='x';",
+        ]
+        self.assertEqual({fingerprint(query) for query in variants},
+                         {"SELECT * FROM T WHERE C = ? AND NAME = ?"})
+
+    def test_in_lists_collapsed(self):
+        """ IN lists of any length and sign collapse to one shape """
+        self.assertEqual(fingerprint("SELECT * FROM t WHERE id IN (1,2 , -3)"),
+                         fingerprint("SELECT * FROM t WHERE id IN (?)"))
+        self.assertEqual(fingerprint("SELECT * FROM t WHERE id IN (?)"), "SELECT * FROM T WHERE ID IN (?...)")
+
+    def test_binary_minus_kept(self):
+        """ subtraction keeps its operator while a unary sign is dropped """
+        self.assertEqual(fingerprint("select a-1, -2 from t"), "SELECT A - ?, ? FROM T")
+        self.assertEqual(fingerprint("UPDATE t SET n=n+1"), "UPDATE T SET N = N + ?")
+
+
+class TestQueryStatsRegistry(unittest.TestCase):
+    """ TESTCASE """
+
+    def test_percentiles_and_totals(self):
+        """ counts and totals are exact and percentiles use nearest rank """
+        registry = QueryStatsRegistry()
+        for duration in range(1, 101):
+            registry.record("Q", float(duration), rows=2)
+        stats = registry.snapshot()["Q"]
+        self.assertEqual(stats['count'], 100)
+        self.assertEqual(stats['total_ms'], 5050)
+        self.assertEqual((stats['p50_ms'], stats['p95_ms'], stats['p99_ms']), (50, 95, 99))
+        self.assertEqual((stats['rows_total'], stats['rows_mean']), (200, 2))
+
+    def test_percentiles_use_recent_window(self):
+        """ only the last `window` durations feed the percentiles """
+        registry = QueryStatsRegistry(window=2)
+        for duration in (100.0, 1.0, 2.0):
+            registry.record("Q", duration)
+        stats = registry.snapshot()["Q"]
+        self.assertEqual(stats['count'], 3)
+        self.assertEqual(stats['p99_ms'], 2)
+
+    def test_errors_counted(self):
+        """ failed calls are counted alongside successful ones """
+        registry = QueryStatsRegistry()
+        registry.record("Q", 1.0, failed=True)
+        registry.record("Q", 1.0)
+        self.assertEqual(registry.snapshot()["Q"]['errors'], 1)
+
+    def test_snapshot_hottest_first(self):
+        """ fingerprints are ordered by total time spent """
+        registry = QueryStatsRegistry()
+        registry.record("FAST", 1.0)
+        registry.record("SLOW", 10.0)
+        self.assertEqual(list(registry.snapshot()), ["SLOW", "FAST"])
+
+
+class TestLogQueriesStructured(unittest.TestCase):
+    """ TESTCASE """
+
+    def setUp(self):
+        """ a private logger and registry for each test """
+        self.handler = ListHandler()
+        self.logger = logging.getLogger(f"queries.test.{self.id()}")
+        self.logger.addHandler(self.handler)
+        self.logger.setLevel(logging.DEBUG)
+        self.logger.propagate = False
+        self.registry = QueryStatsRegistry()
+
+    def tearDown(self):
+        """ detach the capturing handler """
+        self.logger.removeHandler(self.handler)
+
+    def decorate(self, func, **kwargs):
+        """ apply log_queries_structured with this test's logger and registry """
+        return log_queries_structured(logger=self.logger, registry=self.registry, **kwargs)(func)
+
+    def test_successful_call_logged_and_recorded(self):
+        """ a sampled call emits one INFO record carrying its attributes """
+        fetch = self.decorate(lambda query, params=None: [(1,), (2,)])
+        self.assertEqual(fetch("SELECT * FROM users WHERE id = ?", (1,)), [(1,), (2,)])
+
+        record, = self.handler.records
+        self.assertEqual(record.levelno, logging.INFO)
+        self.assertEqual(record.fingerprint, "SELECT * FROM USERS WHERE ID = ?")
+        self.assertEqual(record.params_count, 1)
+        self.assertEqual(record.rows, 2)
+        self.assertIsNone(record.error)
+        self.assertEqual(self.registry.snapshot()["SELECT * FROM USERS WHERE ID = ?"]['rows_total'], 2)
+
+    def test_failed_call_logged_and_recorded(self):
+        """ a call that raises is logged at ERROR and counted as an error """
+        def fetch(query):
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            self.decorate(fetch, sample_rate=0)("SELECT * FROM users")
+
+        record, = self.handler.records
+        self.assertEqual(record.levelno, logging.ERROR)
+        self.assertEqual(record.error, 'ValueError')
+        stats = self.registry.snapshot()["SELECT * FROM USERS"]
+        self.assertEqual((stats['count'], stats['errors']), (1, 1))
+
+    def test_scalar_param_counted(self):
+        """ a bare scalar parameter counts as one """
+        fetch = self.decorate(lambda query, params=None: [])
+        fetch("SELECT * FROM users WHERE id = ?", 5)
+        fetch("SELECT * FROM users", None)
+        fetch("SELECT * FROM users WHERE id = :id", {'id': 5})
+        self.assertEqual([record.params_count for record in self.handler.records], [1, 0, 1])
+
+    def test_unsampled_calls_still_recorded(self):
+        """ sample_rate=0 logs nothing but every call reaches the registry """
+        fetch = self.decorate(lambda query: [], sample_rate=0, slow_query_ms=None)
+        for _ in range(3):
+            fetch("SELECT 1")
+        self.assertEqual(self.handler.records, [])
+        self.assertEqual(self.registry.snapshot()["SELECT ?"]['count'], 3)
+
+
+class TestSetupQueryLogging(unittest.TestCase):
+    """ TESTCASE """
+
+    def tearDown(self):
+        """ undo the setup so other tests see a plain 'queries' logger """
+        handler, listener = log_module._query_logging
+        log_module.query_logger.removeHandler(handler)
+        if listener._thread is not None:
+            listener.stop()
+        log_module._query_logging = None
+        log_module.query_logger.propagate = True
+
+    def test_repeated_setup_logs_once(self):
+        """ a second setup replaces the first instead of adding to it """
+        first, second = ListHandler(), ListHandler()
+        log_module.setup_query_logging(first)
+        log_module.query_logger.info("before")
+        listener = log_module.setup_query_logging(second)
+        log_module.query_logger.info("after")
+        listener.stop()
+
+        self.assertEqual([record.getMessage() for record in first.records], ["before"])
+        self.assertEqual([record.getMessage() for record in second.records], ["after"])
+
+
+if __name__ == '__main__':
+    unittest.main()
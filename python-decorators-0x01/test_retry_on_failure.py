@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+""" Unit tests for retry_on_failure and its retry budget """
+import sqlite3
+import unittest
+
+retry_module = __import__('3-retry_on_failure')
+RetryBudget = retry_module.RetryBudget
+retry_on_failure = retry_module.retry_on_failure
+
+
+class TestRetryBudget(unittest.TestCase):
+    """ TESTCASE """
+
+    def test_backoff_delay_bounds(self):
+        """ delays double per attempt up to max_delay, jitter stays within the ceiling """
+        self.assertEqual([retry_module.backoff_delay(attempt, 1, 5, jitter=False) for attempt in range(5)],
+                         [1, 2, 4, 5, 5])
+        for _ in range(100):
+            self.assertTrue(0 <= retry_module.backoff_delay(3, 1, 5) <= 5)
+
+    def test_transient_errors_classified(self):
+        """ only lock contention counts as transient """
+        self.assertTrue(retry_module.is_transient_error(sqlite3.OperationalError("database is locked")))
+        self.assertFalse(retry_module.is_transient_error(sqlite3.OperationalError("no such table: users")))
+        self.assertFalse(retry_module.is_transient_error(sqlite3.IntegrityError("database is locked")))
+
+    def test_try_spend_until_empty(self):
+        """ tokens are spent one per retry and refilled by successes """
+        budget = RetryBudget(ratio=0.5, max_tokens=2)
+        self.assertTrue(budget.try_spend())
+        self.assertTrue(budget.try_spend())
+        self.assertFalse(budget.try_spend())
+        budget.record_success()
+        self.assertFalse(budget.try_spend())
+        budget.record_success()
+        self.assertTrue(budget.try_spend())
+
+    def test_retries_stop_when_budget_exhausted(self):
+        """ a transient error is raised as soon as the budget runs dry """
+        budget = RetryBudget(ratio=0, max_tokens=1)
+        calls = []
+
+        @retry_on_failure(retries=5, delay=0, budget=budget)
+        def locked():
+            calls.append(1)
+            raise sqlite3.OperationalError("database is locked")
+
+        with self.assertRaises(sqlite3.OperationalError):
+            locked()
+        self.assertEqual(len(calls), 2)
+
+    def test_permanent_error_not_retried(self):
+        """ errors that aren't lock contention are raised on the first attempt """
+        calls = []
+
+        @retry_on_failure(retries=5, delay=0, budget=RetryBudget())
+        def broken():
+            calls.append(1)
+            raise sqlite3.OperationalError("no such table: users")
+
+        with self.assertRaises(sqlite3.OperationalError):
+            broken()
+        self.assertEqual(len(calls), 1)
+
+    def test_transient_error_retried_until_success(self):
+        """ a call that recovers returns its result after retrying """
+        calls = []
+
+        @retry_on_failure(retries=3, delay=0, budget=RetryBudget())
+        def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise sqlite3.OperationalError("database is locked")
+            return 'ok'
+
+        self.assertEqual(flaky(), 'ok')
+        self.assertEqual(len(calls), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
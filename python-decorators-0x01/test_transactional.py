@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+""" Unit tests for GroupCommitter and group_transactional """
+import os
+import sqlite3
+import threading
+import unittest
+from fixtures import TempDatabaseTestCase
+
+transactional_module = __import__('2-transactional')
+GroupCommitter = transactional_module.GroupCommitter
+
+
+def insert_user(conn, user_id, name):
+    """ group-committed write used by the GroupCommitter tests """
+    conn.execute("INSERT INTO users (id, name, email) VALUES (?, ?, ?)", (user_id, name, f"{name}@example.com"))
+    return user_id
+
+
+class TestGroupCommitter(TempDatabaseTestCase):
+    """ TESTCASE """
+
+    def setUp(self):
+        """ a committer on the temporary users.db with a generous window """
+        super().setUp()
+        self.committer = GroupCommitter(self.database, window=0.05, timeout=5)
+
+    def tearDown(self):
+        """ stop the writer thread """
+        self.committer.close()
+        super().tearDown()
+
+    def submit_concurrently(self, calls):
+        """ submit every (func, args) at once and return the results or exceptions in order """
+        outcomes = [None] * len(calls)
+
+        def run(index, func, args):
+            try:
+                outcomes[index] = self.committer.submit(func, *args)
+            except BaseException as e:
+                outcomes[index] = e
+
+        threads = [threading.Thread(target=run, args=(index, func, args))
+                   for index, (func, args) in enumerate(calls)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return outcomes
+
+    def test_calls_committed_together(self):
+        """ concurrent calls all commit and return their results """
+        outcomes = self.submit_concurrently([(insert_user, (user_id, f"user{user_id}")) for user_id in range(10, 20)])
+        self.assertEqual(outcomes, list(range(10, 20)))
+        self.assertEqual(self.count_users(), 12)
+
+    def test_failed_call_rolled_back_alone(self):
+        """ a call that raises is undone without affecting its batch """
+        outcomes = self.submit_concurrently([
+            (insert_user, (10, 'carol')),
+            (insert_user, (1, 'duplicate')),
+            (insert_user, (11, 'dave')),
+        ])
+        self.assertEqual(outcomes[0], 10)
+        self.assertIsInstance(outcomes[1], sqlite3.IntegrityError)
+        self.assertEqual(outcomes[2], 11)
+        self.assertEqual(self.count_users(), 4)
+
+    def test_base_exception_in_call_does_not_stop_writer(self):
+        """ SystemExit from one call reaches its caller and the committer keeps working """
+        def exit_call(conn):
+            insert_user(conn, 10, 'carol')
+            raise SystemExit(1)
+
+        with self.assertRaises(SystemExit):
+            self.committer.submit(exit_call)
+        self.assertEqual(self.committer.submit(insert_user, 11, 'dave'), 11)
+        self.assertEqual(self.count_users(), 3)
+
+    def test_nested_submit_runs_inline(self):
+        """ a batched call submitting another call doesn't deadlock """
+        def outer(conn):
+            insert_user(conn, 10, 'carol')
+            return self.committer.submit(insert_user, 11, 'dave')
+
+        self.assertEqual(self.committer.submit(outer), 11)
+        self.assertEqual(self.count_users(), 4)
+
+    def test_nested_failure_rolled_back_alone(self):
+        """ a failing nested call only undoes its own changes """
+        def outer(conn):
+            insert_user(conn, 10, 'carol')
+            try:
+                self.committer.submit(insert_user, 1, 'duplicate')
+            except sqlite3.IntegrityError:
+                pass
+            return 'done'
+
+        self.assertEqual(self.committer.submit(outer), 'done')
+        self.assertEqual(self.count_users(), 3)
+
+    def test_submit_after_close_raises(self):
+        """ a closed committer refuses calls instead of hanging """
+        self.committer.close()
+        with self.assertRaises(sqlite3.OperationalError):
+            self.committer.submit(insert_user, 10, 'carol')
+
+    def test_failed_writer_fails_callers(self):
+        """ callers get an error when the writer thread can't start """
+        committer = GroupCommitter(os.path.join(self.temp_dir, 'missing', 'users.db'), timeout=5)
+        with self.assertRaises(sqlite3.OperationalError):
+            committer.submit(insert_user, 10, 'carol')
+        committer.close()
+
+    def test_submit_times_out(self):
+        """ a call that doesn't commit within timeout raises TimeoutError """
+        committer = GroupCommitter(self.database, window=0, timeout=0.1)
+        release = threading.Event()
+
+        def slow(conn):
+            release.wait(5)
+
+        try:
+            with self.assertRaises(TimeoutError):
+                committer.submit(slow)
+        finally:
+            release.set()
+            committer.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
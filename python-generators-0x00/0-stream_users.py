@@ -1,23 +1,53 @@
 import mysql.connector
 from mysql.connector import Error
 
-def stream_users():
+def stream_users(prefetch=None):
+    """Yield rows of user_data one by one.
+
+    The cursor is unbuffered (mysql.connector's default), so rows stay on the
+    server until read. With prefetch=None they come off the cursor one at a
+    time; passing an integer reads them in fetchmany(prefetch) windows, so at
+    most `prefetch` rows are held client-side at any time.
+    """
+    if prefetch is not None and prefetch < 1:
+        raise ValueError("prefetch must be a positive integer")
+
+    connection = None
+    cursor = None
+    exhausted = False
     try:
         connection = mysql.connector.connect(
             host='localhost',
             user='root',
-            password='',  
+            password='',
             database='ALX_prodev'
         )
 
-        cursor = connection.cursor(dictionary=True)  # returns each row as a dictionary
+        # buffered=False is already the default; spelled out because early-stop handling below relies on it
+        cursor = connection.cursor(dictionary=True, buffered=False)  # returns each row as a dictionary
         cursor.execute("SELECT * FROM user_data")
 
-        for row in cursor:  
-            yield row        
+        if prefetch is None:
+            for row in cursor:
+                yield row
+        else:
+            while True:
+                rows = cursor.fetchmany(prefetch)  # one window of rows from the server
+                if not rows:
+                    break
+                yield from rows
 
-        cursor.close()
-        connection.close()
+        exhausted = True
 
     except Error as e:
         print(f"Error: {e}")
+
+    finally:
+        if connection is not None:
+            if exhausted:
+                cursor.close()
+                connection.close()
+            else:
+                # Stopped early with rows still pending on the wire: drop the socket
+                # instead of draining the rest of the table just to send QUIT.
+                connection.shutdown()
@@ -1,22 +1,94 @@
+import array
 import mysql.connector
 from mysql.connector import Error
-def stream_users_in_batches(batch_size):
+
+USER_DATA_COLUMNS = ('user_id', 'name', 'email', 'age')
+# array.array typecodes for numeric columns in columnar batches
+COLUMN_TYPECODES = {'age': 'i'}
+# Comparison operators a filter spec may use; they compile straight into SQL
+SQL_OPERATORS = ('=', '!=', '<', '<=', '>', '>=', 'LIKE', 'IN')
+
+def compile_filters(filters):
+    """Split a filter spec into a parameterized WHERE clause and Python predicates.
+
+    Each filter is either a (column, operator, value) tuple, compiled into SQL
+    with the value bound as a parameter, or a callable taking a row dict and
+    returning a bool, which is applied client-side because SQL can't express it.
+    Returns (where_sql, params, predicates); where_sql is '' when nothing compiles.
+    """
+    clauses = []
+    params = []
+    predicates = []
+
+    for spec in filters or ():
+        if callable(spec):
+            predicates.append(spec)
+            continue
+
+        column, operator, value = spec
+        operator = operator.upper()
+        if column not in USER_DATA_COLUMNS:
+            raise ValueError(f"Unknown user_data column: {column}")
+        if operator not in SQL_OPERATORS:
+            raise ValueError(f"Unsupported operator: {operator}")
+
+        if operator == 'IN':
+            values = list(value)
+            if not values:
+                clauses.append("FALSE")  # IN () matches nothing
+                continue
+            clauses.append(f"{column} IN ({', '.join(['%s'] * len(values))})")
+            params.extend(values)
+        else:
+            clauses.append(f"{column} {operator} %s")
+            params.append(value)
+
+    where_sql = " WHERE " + " AND ".join(clauses) if clauses else ""
+    return where_sql, tuple(params), predicates
+
+def to_columnar(column_names, rows):
+    """Turn a list of row tuples into a {column: values} batch.
+
+    Numeric columns listed in COLUMN_TYPECODES become array.array buffers,
+    the rest are tuples of values.
+    """
+    batch = {}
+    for name, values in zip(column_names, zip(*rows)):
+        typecode = COLUMN_TYPECODES.get(name)
+        batch[name] = array.array(typecode, map(int, values)) if typecode else values
+    return batch
+
+def stream_users_in_batches(batch_size, columns=None, filters=None, columnar=False):
+    """Yield user_data rows batch_size at a time.
+
+    By default each batch is a list of row dicts. With columnar=True rows are
+    read as plain tuples and each batch is a column-oriented dict (see
+    to_columnar), so no per-row dict is built.
+    """
+    where_sql, params, predicates = compile_filters(filters)
+    if predicates:
+        raise ValueError("stream_users_in_batches only accepts SQL filters; use batch_processing")
+    for name in columns or ():
+        if name not in USER_DATA_COLUMNS:
+            raise ValueError(f"Unknown user_data column: {name}")
+    projection = ", ".join(columns) if columns else "*"
+
     try:
         connection = mysql.connector.connect(
             host='localhost',
             user='root',
-            password='',  
+            password='',
             database='ALX_prodev'
         )
 
-        cursor = connection.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM user_data")
+        cursor = connection.cursor(dictionary=not columnar)
+        cursor.execute(f"SELECT {projection} FROM user_data{where_sql}", params)
 
         while True:
             batch = cursor.fetchmany(batch_size)  # Fetch a list of rows
             if not batch:  # No more data
                 break
-            yield batch  
+            yield to_columnar(cursor.column_names, batch) if columnar else batch
 
         cursor.close()
         connection.close()
@@ -24,8 +96,18 @@ def stream_users_in_batches(batch_size):
     except Error as e:
         print(f"Error: {e}")
 
-def batch_processing(batch_size):
-    for batch in stream_users_in_batches(batch_size):
+def batch_processing(batch_size, filters=(('age', '>', 25),), columns=None):
+    """Yield users matching `filters` (see compile_filters), defaulting to age > 25.
+
+    Tuple filters are evaluated by MySQL so non-matching rows never leave the
+    server; only callable filters run here. `columns` limits the selected
+    columns and must include any column a callable filter reads.
+    """
+    filters = filters or ()
+    sql_filters = [spec for spec in filters if not callable(spec)]
+    predicates = [spec for spec in filters if callable(spec)]
+
+    for batch in stream_users_in_batches(batch_size, columns, sql_filters):
         for user in batch:
-            if user['age'] > 25:
-                yield user  
+            if all(predicate(user) for predicate in predicates):
+                yield user
@@ -1,14 +1,22 @@
+import base64
+import queue
+import threading
 import mysql.connector
 from mysql.connector import Error
 
-def paginate_users(page_size, offset):
+def connect_to_prodev():
+    return mysql.connector.connect(
+        host='localhost',
+        user='root',
+        password='',
+        database='ALX_prodev'
+    )
+
+def paginate_users(page_size, offset, connection=None):
     try:
-        connection = mysql.connector.connect(
-            host='localhost',
-            user='root',
-            password='',  
-            database='ALX_prodev'
-        )
+        own_connection = connection is None
+        if own_connection:
+            connection = connect_to_prodev()
 
         cursor = connection.cursor(dictionary=True)
         query = "SELECT * FROM user_data LIMIT %s OFFSET %s"
@@ -16,7 +24,8 @@ def paginate_users(page_size, offset):
         results = cursor.fetchall()
 
         cursor.close()
-        connection.close()
+        if own_connection:
+            connection.close()
 
         return results  # A list of user dictionaries
 
@@ -24,11 +33,206 @@ def paginate_users(page_size, offset):
         print(f"Error: {e}")
         return []  # Return empty list on failure
 
-def lazy_paginate(page_size):
-    offset = 0
-    while True:
-        page = paginate_users(page_size, offset)
-        if not page:
-            break
-        yield page  
-        offset += page_size
+def paginate_users_after(page_size, after_id=None, connection=None):
+    """Fetch the page of users whose user_id sorts after `after_id`.
+
+    Seeks on the user_id primary key, so every page costs one index range
+    scan no matter how deep into the table it is. Pass `connection` to reuse
+    an open connection instead of opening one for this page.
+    """
+    try:
+        own_connection = connection is None
+        if own_connection:
+            connection = connect_to_prodev()
+
+        results = _fetch_page_after(connection, page_size, after_id)
+
+        if own_connection:
+            connection.close()
+
+        return results
+
+    except Error as e:
+        print(f"Error: {e}")
+        return []
+
+def _fetch_page_after(connection, page_size, after_id):
+    # Like paginate_users_after, but errors reach the caller instead of ending the walk
+    cursor = connection.cursor(dictionary=True)
+    try:
+        if after_id is None:
+            query = "SELECT * FROM user_data ORDER BY user_id LIMIT %s"
+            cursor.execute(query, (page_size,))
+        else:
+            query = "SELECT * FROM user_data WHERE user_id > %s ORDER BY user_id LIMIT %s"
+            cursor.execute(query, (after_id, page_size))
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+class PaginationError(Error):
+    """Raised when a keyset walk fails part way through.
+
+    `resume_token` resumes the walk right after the last page it yielded
+    (None to start over), so pass it back as lazy_paginate's resume_token.
+    """
+    def __init__(self, resume_token, error):
+        super().__init__(msg=f"Page fetch failed: {error}")
+        self.resume_token = resume_token
+
+def next_page_token(page):
+    """Return an opaque token that resumes a keyset walk right after `page`."""
+    if not page:
+        return None
+    return _encode_page_token(page[-1]['user_id'])
+
+def _encode_page_token(last_id):
+    if last_id is None:
+        return None
+    return base64.urlsafe_b64encode(last_id.encode()).decode()
+
+def _decode_page_token(token):
+    if token is None:
+        return None
+    return base64.urlsafe_b64decode(token.encode()).decode()
+
+_DONE = object()
+
+
+class _Failure:
+    # Carries an exception raised by the read-ahead thread over to the consumer
+    def __init__(self, error):
+        self.error = error
+
+def read_ahead(pages, depth):
+    """Yield from `pages` while a background thread keeps up to `depth` pages ready.
+
+    Fetching the next pages overlaps with the caller processing the current
+    one. When the caller stops early the thread is told to stop, `pages` is
+    closed (releasing its connection) and the thread is joined.
+    """
+    buffer = queue.Queue(depth)
+    stopped = threading.Event()
+
+    def put(item):
+        # Wait for room in the buffer, giving up once the consumer has gone
+        while not stopped.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for page in pages:
+                if not put(page):
+                    return
+            put(_DONE)
+        except BaseException as e:
+            put(_Failure(e))
+        finally:
+            pages.close()
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+
+    try:
+        while True:
+            item = buffer.get()
+            if item is _DONE:
+                break
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        stopped.set()
+        producer.join()
+
+def lazy_paginate(page_size, keyset=False, resume_token=None, pool=None, prefetch=0):
+    """Yield pages of users lazily.
+
+    keyset=True walks the table in user_id order with WHERE user_id > last
+    seen id instead of LIMIT/OFFSET, so a full export is linear. Pass the
+    value of next_page_token(page) as resume_token to pick up a walk where
+    it stopped. If a keyset walk hits a database error it raises
+    PaginationError, whose resume_token picks up after the last page yielded;
+    an offset walk just stops.
+
+    One connection is held for the whole walk (borrowed from `pool` when
+    given, e.g. a mysql.connector.pooling.MySQLConnectionPool) and released
+    as soon as the generator finishes, is closed, or is garbage collected.
+
+    prefetch=K fetches pages on a background thread that keeps up to K pages
+    queued ahead of the caller (see read_ahead).
+    """
+    pages = _walk_pages(page_size, keyset, resume_token, pool)
+    if prefetch > 0:
+        pages = read_ahead(pages, prefetch)
+    yield from pages
+
+def _walk_pages(page_size, keyset, resume_token, pool):
+    if not keyset and resume_token is not None:
+        raise ValueError("resume_token is only supported with keyset=True")
+
+    try:
+        connection = pool.get_connection() if pool is not None else connect_to_prodev()
+    except Error as e:
+        if keyset:
+            raise PaginationError(resume_token, e) from e
+        print(f"Error: {e}")
+        return
+
+    try:
+        if not keyset:
+            offset = 0
+            while True:
+                page = paginate_users(page_size, offset, connection)
+                if not page:
+                    break
+                yield page
+                offset += page_size
+            return
+
+        after_id = _decode_page_token(resume_token)
+        while True:
+            try:
+                page = _fetch_page_after(connection, page_size, after_id)
+            except Error as e:
+                raise PaginationError(_encode_page_token(after_id), e) from e
+            if not page:
+                break
+            yield page
+            if len(page) < page_size:  # short page means we reached the end
+                break
+            after_id = page[-1]['user_id']
+    finally:
+        connection.close()  # returns pooled connections to their pool
+
+
+def benchmark_page_latency(page_size=100, pages=200):
+    """Compare mean per-page latency of a connection per page vs one held connection."""
+    import time
+
+    start = time.perf_counter()
+    for _ in range(pages):
+        paginate_users_after(page_size, None)
+    per_call = (time.perf_counter() - start) / pages
+
+    connection = connect_to_prodev()
+    try:
+        start = time.perf_counter()
+        for _ in range(pages):
+            paginate_users_after(page_size, None, connection)
+        persistent = (time.perf_counter() - start) / pages
+    finally:
+        connection.close()
+
+    print(f"connection per page: {per_call * 1000:.2f} ms/page")
+    print(f"persistent connection: {persistent * 1000:.2f} ms/page")
+    return per_call, persistent
+
+
+if __name__ == "__main__":
+    benchmark_page_latency()
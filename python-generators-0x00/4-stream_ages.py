@@ -1,14 +1,21 @@
 import mysql.connector
 from mysql.connector import Error
 
+# SQL aggregate functions that aggregate_user_data can push down to MySQL
+AGGREGATES = {'avg': 'AVG', 'count': 'COUNT', 'sum': 'SUM', 'min': 'MIN', 'max': 'MAX'}
+USER_DATA_COLUMNS = ('user_id', 'name', 'email', 'age')
+
+def connect_to_prodev():
+    return mysql.connector.connect(
+        host='localhost',
+        user='root',
+        password='',
+        database='ALX_prodev'
+    )
+
 def stream_user_ages():
     try:
-        connection = mysql.connector.connect(
-            host='localhost',
-            user='root',
-            password='',
-            database='ALX_prodev'
-        )
+        connection = connect_to_prodev()
 
         cursor = connection.cursor()
         cursor.execute("SELECT age FROM user_data")
@@ -23,17 +30,107 @@ def stream_user_ages():
         print(f" Error: {e}")
 
 
-def compute_average_age():
-    total = 0
+def stream_age_batches(batch_size=1000):
+    """Yield lists of ages, batch_size at a time, straight from fetchmany."""
+    try:
+        connection = connect_to_prodev()
+
+        cursor = connection.cursor()
+        cursor.execute("SELECT age FROM user_data")
+
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield [row[0] for row in rows]
+
+        cursor.close()
+        connection.close()
+
+    except Error as e:
+        print(f" Error: {e}")
+
+
+def aggregate_user_data(column='age', aggregates=('avg', 'count', 'sum', 'min', 'max'), group_by=None):
+    """Compute aggregates of a user_data column inside MySQL.
+
+    Returns a dict such as {'avg': ..., 'count': ...}, or a list of such dicts
+    (each with the group_by value under its column name) when group_by is set.
+    On a database error it prints the error and returns None (or [] with group_by).
+    Column names are checked against user_data since they cannot be bound
+    as query parameters.
+    """
+    if not isinstance(aggregates, (tuple, list)) or not aggregates:
+        raise ValueError("aggregates must be a non-empty tuple or list of aggregate names")
+    for name in (column, group_by):
+        if name is not None and name not in USER_DATA_COLUMNS:
+            raise ValueError(f"Unknown user_data column: {name}")
+    for name in aggregates:
+        if name not in AGGREGATES:
+            raise ValueError(f"Unsupported aggregate: {name}")
+
+    select = [f"{AGGREGATES[name]}({column}) AS {name}" for name in aggregates]
+    if group_by is not None:
+        select.insert(0, group_by)
+    query = f"SELECT {', '.join(select)} FROM user_data"
+    if group_by is not None:
+        query += f" GROUP BY {group_by} ORDER BY {group_by}"
+
+    try:
+        connection = connect_to_prodev()
+
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute(query)
+        results = cursor.fetchall()
+
+        cursor.close()
+        connection.close()
+
+    except Error as e:
+        print(f" Error: {e}")
+        return [] if group_by is not None else None
+
+    return results if group_by is not None else results[0]
+
+
+def streaming_age_stats(batch_size=1000):
+    """Compute count/sum/min/max/avg of ages in one pass over fetchmany batches.
+
+    Each batch is reduced with the builtin sum/min/max, which loop in C,
+    instead of doing Python arithmetic per row.
+    """
     count = 0
+    total = 0
+    lowest = None
+    highest = None
 
-    for age in stream_user_ages():  
-        total += age
-        count += 1
+    for ages in stream_age_batches(batch_size):
+        count += len(ages)
+        total += sum(ages)
+        batch_min = min(ages)
+        batch_max = max(ages)
+        lowest = batch_min if lowest is None else min(lowest, batch_min)
+        highest = batch_max if highest is None else max(highest, batch_max)
 
-    if count > 0:
-        average = total / count
+    return {
+        'avg': total / count if count else None,
+        'count': count,
+        'sum': total,
+        'min': lowest,
+        'max': highest,
+    }
+
+
+def compute_average_age(pushdown=True):
+    # Let MySQL compute the average; stream the ages when asked to or if that query fails
+    stats = aggregate_user_data(aggregates=('avg', 'count')) if pushdown else None
+    if stats is None:
+        if pushdown:
+            print("Aggregate query failed; streaming ages instead.")
+        stats = streaming_age_stats()
+
+    if stats and stats['count'] > 0:
+        average = stats['avg']
         print(f"Average age of users: {average:.2f}")
     else:
         print("No user data found.")
-
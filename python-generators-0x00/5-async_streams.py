@@ -0,0 +1,94 @@
+import asyncio
+import threading
+
+stream_users = __import__('0-stream_users').stream_users
+stream_users_in_batches = __import__('1-batch_processing').stream_users_in_batches
+lazy_paginate = __import__('2-lazy_paginate').lazy_paginate
+stream_user_ages = __import__('4-stream_ages').stream_user_ages
+
+_DONE = object()
+
+
+class _Failure:
+    # Carries an exception raised by the producer thread over to the consumer
+    def __init__(self, error):
+        self.error = error
+
+
+async def aiter_in_thread(generator, maxsize=4, chunk_size=1):
+    """Drive a blocking generator from a worker thread as an async generator.
+
+    The thread pushes lists of up to chunk_size items into a queue holding at
+    most maxsize lists; when the queue is full the thread blocks, so a slow
+    consumer throttles the database reads instead of buffering them. Closing
+    the async generator early stops the thread and closes `generator`.
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(maxsize)
+    stopped = threading.Event()
+
+    def put(item):
+        # Blocks this thread until the event loop has room in the queue
+        try:
+            asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+        except RuntimeError:
+            stopped.set()  # event loop closed under us; nobody is listening
+
+    def produce():
+        try:
+            chunk = []
+            for item in generator:
+                chunk.append(item)
+                if len(chunk) >= chunk_size:
+                    if stopped.is_set():
+                        return
+                    put(chunk)
+                    chunk = []
+            if chunk and not stopped.is_set():
+                put(chunk)
+            if not stopped.is_set():
+                put(_DONE)
+        except BaseException as e:
+            if not stopped.is_set():
+                put(_Failure(e))
+        finally:
+            generator.close()
+
+    threading.Thread(target=produce, daemon=True).start()
+
+    try:
+        while True:
+            chunk = await queue.get()
+            if chunk is _DONE:
+                break
+            if isinstance(chunk, _Failure):
+                raise chunk.error
+            for item in chunk:
+                yield item
+    finally:
+        stopped.set()
+        # Free up the queue so a producer blocked in put() can see the stop flag
+        while not queue.empty():
+            queue.get_nowait()
+
+
+async def async_stream_users(prefetch=None, maxsize=4, chunk_size=500):
+    async for row in aiter_in_thread(stream_users(prefetch), maxsize, chunk_size):
+        yield row
+
+
+async def async_stream_users_in_batches(batch_size, columns=None, filters=None, columnar=False, maxsize=4):
+    batches = stream_users_in_batches(batch_size, columns, filters, columnar)
+    async for batch in aiter_in_thread(batches, maxsize):
+        yield batch
+
+
+async def async_lazy_paginate(page_size, keyset=False, resume_token=None, pool=None, maxsize=4):
+    pages = lazy_paginate(page_size, keyset, resume_token, pool)
+    async for page in aiter_in_thread(pages, maxsize):
+        yield page
+
+
+async def async_stream_user_ages(maxsize=4, chunk_size=1000):
+    async for age in aiter_in_thread(stream_user_ages(), maxsize, chunk_size):
+        yield age
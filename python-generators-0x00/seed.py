@@ -8,6 +8,8 @@ from mysql.connector import Error
 import csv
 import uuid
 import os
+import time
+import multiprocessing
 
 
 def connect_db():
@@ -76,39 +78,171 @@ def create_table(connection):
         print(f"Error creating table: {e}")
 
 
-def insert_data(connection, csv_file):
+INSERT_USER_SQL = """
+    INSERT INTO user_data (user_id, name, email, age)
+    VALUES (%s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE user_id = user_id
+"""
+
+
+def chunk_rows(reader, chunk_size):
+    # Group csv.DictReader rows into lists of (user_id, name, email, age) tuples
+    chunk = []
+    for row in reader:
+        chunk.append((row['user_id'], row['name'], row['email'], row['age']))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def read_csv_chunks(csv_file, chunk_size):
+    # Yield the whole CSV file chunk_size rows at a time
+    with open(csv_file, mode='r', newline='') as file:
+        yield from chunk_rows(csv.DictReader(file), chunk_size)
+
+
+def insert_data(connection, csv_file, chunk_size=5000):
     try:
         cursor = connection.cursor()
+        started = time.perf_counter()
+        total = 0
+
+        # executemany rewrites each chunk into one multi-row INSERT; rows whose
+        # user_id already exists are left untouched by ON DUPLICATE KEY.
+        for chunk in read_csv_chunks(csv_file, chunk_size):
+            cursor.executemany(INSERT_USER_SQL, chunk)
+            connection.commit()  # Save each chunk so a failure only loses the current one
+            total += len(chunk)
 
-        # Open the CSV file in read mode
-        with open(csv_file, mode='r') as file:
-            reader = csv.DictReader(file)  # Reads each row as a dictionary: {'user_id': ..., 'name': ..., etc.}
-
-            for row in reader:
-                # Check if user_id already exists in the table
-                cursor.execute("SELECT * FROM user_data WHERE user_id = %s", (row['user_id'],))
-                if cursor.fetchone():  # If any result is returned, skip this row
-                    continue
-
-                # Insert data into the table
-                cursor.execute('''
-                    INSERT INTO user_data (user_id, name, email, age)
-                    VALUES (%s, %s, %s, %s)
-                ''', (
-                    row['user_id'],   # UUID string
-                    row['name'],      # Full name
-                    row['email'],     # Email address
-                    row['age']        # Age as decimal
-                ))
-
-        connection.commit()  # Save changes to database
-        print(" Data inserted successfully")
+        elapsed = time.perf_counter() - started
+        rate = total / elapsed if elapsed > 0 else 0
+        print(f" Data inserted successfully ({total} rows in {elapsed:.2f}s, {rate:.0f} rows/sec)")
         cursor.close()
 
     except Error as e:
         print(f" Error inserting data: {e}")
 
 
+def load_data_infile(connection, csv_file):
+    """
+    Bulk load csv_file with LOAD DATA LOCAL INFILE, skipping duplicate user_ids.
+    The connection must be opened with allow_local_infile=True and the server
+    must have local_infile enabled.
+    """
+    try:
+        cursor = connection.cursor()
+        started = time.perf_counter()
+        cursor.execute("""
+            LOAD DATA LOCAL INFILE %s
+            IGNORE INTO TABLE user_data
+            FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"'
+            LINES TERMINATED BY '\\n'
+            IGNORE 1 LINES
+            (user_id, name, email, age)
+        """, (os.path.abspath(csv_file),))
+        connection.commit()
+
+        total = cursor.rowcount
+        elapsed = time.perf_counter() - started
+        rate = total / elapsed if elapsed > 0 else 0
+        print(f" Data loaded successfully ({total} rows in {elapsed:.2f}s, {rate:.0f} rows/sec)")
+        cursor.close()
+
+    except Error as e:
+        print(f" Error loading data: {e}")
+
+
+
+def split_csv_ranges(csv_file, parts):
+    """
+    Split the data section of csv_file into up to `parts` byte ranges that each
+    start and end on a line boundary. Returns (header_line, [(start, end), ...]).
+    Rows must not contain embedded newlines.
+    """
+    size = os.path.getsize(csv_file)
+    with open(csv_file, mode='rb') as file:
+        header = file.readline().decode()
+        data_start = file.tell()
+        step = max((size - data_start) // parts, 1)
+
+        bounds = [data_start]
+        for i in range(1, parts):
+            file.seek(data_start + i * step)
+            file.readline()  # move to the start of the next full line
+            position = file.tell()
+            if bounds[-1] < position < size:
+                bounds.append(position)
+        bounds.append(size)
+
+    return header, list(zip(bounds, bounds[1:]))
+
+
+def _seed_range(task):
+    # Worker process: load the rows of one byte range over its own connection
+    csv_file, fieldnames, start, end, chunk_size = task
+    connection = connect_to_prodev()
+    if connection is None:
+        return 0, [f"bytes {start}-{end}: could not connect to ALX_prodev"]
+
+    rows = 0
+    errors = []
+    try:
+        cursor = connection.cursor()
+        with open(csv_file, mode='rb') as file:
+            file.seek(start)
+
+            def lines():
+                while file.tell() < end:
+                    line = file.readline()
+                    if not line:
+                        break
+                    yield line.decode()
+
+            reader = csv.DictReader(lines(), fieldnames=fieldnames)
+            for chunk in chunk_rows(reader, chunk_size):
+                cursor.executemany(INSERT_USER_SQL, chunk)
+                connection.commit()
+                rows += len(chunk)
+        cursor.close()
+
+    except Error as e:
+        errors.append(f"bytes {start}-{end}: {e}")
+
+    finally:
+        connection.close()
+
+    return rows, errors
+
+
+def insert_data_parallel(csv_file, workers=None, chunk_size=5000):
+    """
+    Seed user_data from csv_file with `workers` processes, each inserting its
+    own byte ranges of the file over its own connection to ALX_prodev.
+    Returns (rows_inserted, errors).
+    """
+    workers = workers or os.cpu_count() or 1
+    # A few ranges per worker keeps all of them busy and gives finer progress
+    header, ranges = split_csv_ranges(csv_file, workers * 4)
+    fieldnames = next(csv.reader([header]))
+    tasks = [(csv_file, fieldnames, start, end, chunk_size) for start, end in ranges]
+
+    started = time.perf_counter()
+    total = 0
+    errors = []
+    with multiprocessing.Pool(workers) as pool:
+        for done, (rows, range_errors) in enumerate(pool.imap_unordered(_seed_range, tasks), 1):
+            total += rows
+            errors.extend(range_errors)
+            elapsed = time.perf_counter() - started
+            rate = total / elapsed if elapsed > 0 else 0
+            print(f" [{done}/{len(tasks)}] {total} rows, {rate:.0f} rows/sec")
+
+    for error in errors:
+        print(f" Error inserting data: {error}")
+    return total, errors
+
 
 def stream_user_data(connection):
     try: